@@ -0,0 +1,167 @@
+import numpy as np
+from CSRGraph import expand_rows
+
+__license__ = "BSD-2-Clause"
+
+
+class CascadeKernel(object):
+    """
+        Batched Independent Cascade semantics
+
+        Every newly activated node gets one chance to activate each of its
+        neighbours: slot s of the CSR snapshot fires with probability
+        probabilities[s]. Nodes that are not spreaders (they already
+        attempted in the model) can be activated but never attempt.
+    """
+
+    def __init__(self, indptr, indices, probabilities):
+        """
+            Kernel Constructor
+
+            :param indptr: CSR row pointer array
+            :param indices: CSR neighbour array
+            :param probabilities: activation probability of every slot
+        """
+        self.indptr = indptr
+        self.indices = indices
+        self.probabilities = probabilities
+
+    def run(self, active, frontier, rng, spreaders=None):
+        """
+        Run a batch of cascades to completion
+
+        :param active: (runs x nodes) boolean matrix of active nodes, updated in place
+        :param frontier: (runs x nodes) boolean matrix of the nodes still to attempt their neighbours
+        :param rng: numpy Generator drawing the coin flips
+        :param spreaders: boolean array of the nodes allowed to attempt once active (default: all of them)
+        :return: the active matrix
+        """
+        self.curve(active, frontier, [], rng, spreaders)
+        return active
+
+    def curve(self, active, frontier, seeds, rng, spreaders=None):
+        """
+        Run a batch of cascades for every prefix of a seed sequence, each
+        prefix resuming from where the previous one stopped
+
+        :param active: (runs x nodes) boolean matrix of active nodes, updated in place
+        :param frontier: (runs x nodes) boolean matrix of the nodes still to attempt their neighbours
+        :param seeds: dense ids of the seeds, in activation order
+        :param rng: numpy Generator drawing the coin flips
+        :param spreaders: boolean array of the nodes allowed to attempt once active (default: all of them)
+        :return: (runs x len(seeds)+1) array, column i holding the active set size with the first i seeds
+        """
+        n = active.shape[1]
+        flat = active.reshape(-1)
+        sizes = np.empty((active.shape[0], len(seeds) + 1), dtype=np.int64)
+        runs, nodes = np.nonzero(frontier)
+        for i in range(len(seeds) + 1):
+            if i > 0:
+                runs = np.flatnonzero(~active[:, seeds[i - 1]])
+                nodes = np.full(len(runs), seeds[i - 1], dtype=np.int64)
+                active[runs, seeds[i - 1]] = True
+            self.__spread(flat, n, runs, nodes, rng, spreaders)
+            sizes[:, i] = active.sum(axis=1)
+        return sizes
+
+    def __spread(self, flat, n, runs, nodes, rng, spreaders):
+        while len(nodes) > 0:
+            if spreaders is not None:
+                attempts = spreaders[nodes]
+                runs, nodes = runs[attempts], nodes[attempts]
+            slots, owners = expand_rows(self.indptr, nodes)
+            cells = runs[owners] * n + self.indices[slots]
+            flips = rng.random(len(slots))
+            cells = cells[(flips <= self.probabilities[slots]) & ~flat[cells]]
+            cells = np.unique(cells)
+            flat[cells] = True
+            runs, nodes = np.divmod(cells, n)
+
+
+class ThresholdKernel(object):
+    """
+        Batched Linear Threshold semantics
+
+        A node activates once the weight accumulated from its active
+        neighbours reaches its threshold. With no fixed thresholds, every
+        realization draws its own uniform thresholds.
+    """
+
+    def __init__(self, out_indptr, out_targets, out_weights, has_predecessors, thresholds=None):
+        """
+            Kernel Constructor
+
+            :param out_indptr: row pointer of the weight entries grouped by contributing node
+            :param out_targets: node receiving each weight entry
+            :param out_weights: weight of each entry
+            :param has_predecessors: boolean array, nodes without predecessors never activate
+            :param thresholds: node thresholds, or None to draw them uniformly per realization
+        """
+        self.out_indptr = out_indptr
+        self.out_targets = out_targets
+        self.out_weights = out_weights
+        self.has_predecessors = has_predecessors
+        self.thresholds = thresholds
+
+    def run(self, active, frontier, rng, spreaders=None):
+        """
+        Run a batch of diffusions to completion
+
+        :param active: (runs x nodes) boolean matrix of active nodes, updated in place
+        :param frontier: (runs x nodes) boolean matrix of the active nodes whose weight is not counted yet
+        :param rng: numpy Generator drawing the thresholds, when not fixed
+        :param spreaders: unused, every active node weighs on its neighbours
+        :return: the active matrix
+        """
+        self.curve(active, frontier, [], rng)
+        return active
+
+    def curve(self, active, frontier, seeds, rng, spreaders=None):
+        """
+        Run a batch of diffusions for every prefix of a seed sequence, each
+        prefix resuming from where the previous one stopped (with the same
+        thresholds and accumulated weights)
+
+        :param active: (runs x nodes) boolean matrix of active nodes, updated in place
+        :param frontier: (runs x nodes) boolean matrix of the active nodes whose weight is not counted yet
+        :param seeds: dense ids of the seeds, in activation order
+        :param rng: numpy Generator drawing the thresholds, when not fixed
+        :param spreaders: unused, every active node weighs on its neighbours
+        :return: (runs x len(seeds)+1) array, column i holding the active set size with the first i seeds
+        """
+        r, n = active.shape
+        flat = active.reshape(-1)
+        if self.thresholds is None:
+            thresholds = rng.random(r * n)
+        else:
+            thresholds = np.tile(self.thresholds, r)
+        state = (thresholds, np.zeros(r * n, dtype=np.float64), np.tile(self.has_predecessors, r))
+
+        # nodes that need no active neighbour at all
+        cells = np.flatnonzero(~flat & state[2] & (thresholds <= 0))
+        runs, nodes = np.nonzero(frontier)
+        sizes = np.empty((r, len(seeds) + 1), dtype=np.int64)
+        for i in range(len(seeds) + 1):
+            if i > 0:
+                runs = np.flatnonzero(~active[:, seeds[i - 1]])
+                nodes = np.full(len(runs), seeds[i - 1], dtype=np.int64)
+                active[runs, seeds[i - 1]] = True
+                cells = runs[:0]
+            self.__spread(flat, n, state, runs, nodes, cells)
+            sizes[:, i] = active.sum(axis=1)
+        return sizes
+
+    def __spread(self, flat, n, state, runs, nodes, cells):
+        thresholds, accumulated, has_predecessors = state
+        while True:
+            slots, owners = expand_rows(self.out_indptr, nodes)
+            touched = runs[owners] * n + self.out_targets[slots]
+            np.add.at(accumulated, touched, self.out_weights[slots])
+
+            cells = np.union1d(cells, touched)
+            cells = cells[~flat[cells] & has_predecessors[cells] & (accumulated[cells] >= thresholds[cells])]
+            if len(cells) == 0:
+                break
+            flat[cells] = True
+            runs, nodes = np.divmod(cells, n)
+            cells = cells[:0]
@@ -0,0 +1,145 @@
+import numpy as np
+
+__license__ = "BSD-2-Clause"
+
+
+class CSRGraph(object):
+    """
+        Compressed sparse row snapshot of a graph
+
+        Nodes are mapped to dense ids following the order of ``graph.nodes``.
+        Row ``i`` lists the neighbours node ``i`` can reach (successors in a
+        directed graph, all neighbours otherwise): they are stored in
+        ``indices[indptr[i]:indptr[i + 1]]``. Each slot also records, in
+        ``edge_ids``, the position in ``graph.edges`` of the edge it comes
+        from, so that edge attributes can be laid out along the slots.
+    """
+
+    def __init__(self, graph):
+        """
+            Snapshot Constructor
+
+            :param graph: a netdispatch AGraph object
+        """
+        self.directed = graph.directed
+        self.nodes = list(graph.nodes)
+        self.node_index = {n: i for i, n in enumerate(self.nodes)}
+        self.edges = list(graph.edges)
+
+        n = len(self.nodes)
+        m = len(self.edges)
+        src = np.fromiter((self.node_index[e[0]] for e in self.edges), dtype=np.int64, count=m)
+        dst = np.fromiter((self.node_index[e[1]] for e in self.edges), dtype=np.int64, count=m)
+        eid = np.arange(m, dtype=np.int64)
+
+        if not self.directed:
+            loop = src == dst
+            src, dst = np.concatenate((src, dst[~loop])), np.concatenate((dst, src[~loop]))
+            eid = np.concatenate((eid, eid[~loop]))
+
+        # one slot per (source, target) pair, as neighbour lists do not repeat nodes
+        _, first = np.unique(src * n + dst, return_index=True)
+        self.indices = dst[first]
+        self.edge_ids = eid[first]
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src[first], minlength=n), out=self.indptr[1:])
+
+        self.__transpose = None
+
+    def number_of_nodes(self):
+        return len(self.nodes)
+
+    def number_of_slots(self):
+        return len(self.indices)
+
+    def out_degree(self):
+        """
+        :return: array with the row length of every node
+        """
+        return np.diff(self.indptr)
+
+    def in_degree(self):
+        """
+        :return: array with the number of slots pointing at every node
+        """
+        return np.bincount(self.indices, minlength=len(self.nodes))
+
+    def neighbors(self, i):
+        """
+        :param i: dense node id
+        :return: dense ids of the neighbours of node i
+        """
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def sources(self):
+        """
+        :return: array holding, for every slot, the dense id of its row
+        """
+        return np.repeat(np.arange(len(self.nodes), dtype=np.int64), np.diff(self.indptr))
+
+    def transpose(self):
+        """
+        Reverse the direction of every slot (predecessor lists)
+
+        :return: (indptr, indices, slots) where slots maps each reversed slot to the slot it mirrors
+        """
+        if self.__transpose is None:
+            self.__transpose = transpose(self.indptr, self.indices)
+        return self.__transpose
+
+    def edge_values(self, edge_to_value, default=None):
+        """
+        Lay out an edge attribute along the slots
+
+        For undirected graphs a missing (u, v) key falls back on (v, u), as
+        the models did when reading the configuration dictionaries. Values
+        given as an array are gathered along edge_ids.
+
+        :param edge_to_value: dictionary mapping each edge to a value, or array of values in graph.edges order
+        :param default: value used for the edges not in the dictionary (NaN if None)
+        :return: float array with one value per slot
+        """
+        if isinstance(edge_to_value, np.ndarray):
+            return edge_to_value[self.edge_ids].astype(np.float64, copy=False)
+
+        values = np.full(len(self.indices), np.nan if default is None else default, dtype=np.float64)
+        nodes = self.nodes
+        for s, (i, j) in enumerate(zip(self.sources().tolist(), self.indices.tolist())):
+            u, v = nodes[i], nodes[j]
+            if (u, v) in edge_to_value:
+                values[s] = edge_to_value[(u, v)]
+            elif not self.directed and (v, u) in edge_to_value:
+                values[s] = edge_to_value[(v, u)]
+        return values
+
+
+def expand_rows(indptr, rows):
+    """
+    Slot positions covered by a set of CSR rows
+
+    :param indptr: CSR row pointer array
+    :param rows: array of row ids
+    :return: (slots, owners) where owners[k] is the position in rows of the row slots[k] belongs to
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    owners = np.repeat(np.arange(len(rows), dtype=np.int64), lengths)
+    offsets = np.arange(len(owners), dtype=np.int64) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return starts[owners] + offsets, owners
+
+
+def transpose(indptr, indices):
+    """
+    Reverse the direction of every slot of a CSR structure
+
+    :param indptr: CSR row pointer array
+    :param indices: CSR column array
+    :return: (indptr, indices, slots) of the reversed structure, slots mapping each reversed slot to the original one
+    """
+    n = len(indptr) - 1
+    rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+    slots = np.argsort(indices, kind='stable')
+    reversed_indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=n), out=reversed_indptr[1:])
+    return reversed_indptr, rows[slots], slots
@@ -0,0 +1,195 @@
+import numpy as np
+from CSRGraph import expand_rows, transpose
+from LiveEdgeSampling import LiveEdgeSamples
+
+__license__ = "BSD-2-Clause"
+
+
+class ReachabilitySketches(object):
+    """
+        Combined bottom-k reachability sketches (Cohen, Delling, Pajor and
+        Werneck, 2014) over the instances of a LiveEdgeSamples object
+
+        Every (node, instance) pair gets a uniform random rank. The sketch
+        of node u holds the k smallest ranks among the pairs (v, i) such that
+        v is reachable from u in instance i, which gives an estimate of the
+        spread of u with a relative error around 1/sqrt(k - 2).
+
+        Pairs are processed by increasing rank, in batches, each with a
+        reverse search in its instance. A search stops at the nodes that
+        already got k ranks from that instance: every node upstream has got
+        them too, so the ranks left cannot enter its sketch.
+
+        The pair behind every entry is kept, so that once pairs get covered
+        (activated by selected seeds) the sketches estimate the residual
+        spread without being built again: see estimate().
+    """
+
+    def __init__(self, samples, k=32, covered=None, ranks=None, batch=256):
+        """
+            Sketches Constructor
+
+            :param samples: a LiveEdgeSamples object
+            :param k: sketch size
+            :param covered: optional (instances x nodes) boolean matrix of pairs left out (already activated)
+            :param ranks: optional (instances x nodes) matrix of ranks (default: drawn from the model generator)
+            :param batch: number of pairs searched from at once
+        """
+        r, n = samples.runs, samples.model.csr.number_of_nodes()
+        if ranks is None:
+            ranks = samples.model.rng.random((r, n))
+        if covered is None:
+            covered = np.zeros((r, n), dtype=np.bool_)
+        self.samples = samples
+        self.k = k
+        self.ranks = ranks
+        self.covered = covered
+        self.sketches = np.full((n, k), np.inf)
+        self.pairs = np.full((n, k), -1, dtype=np.int64)
+        self.size = np.zeros(n, dtype=np.int64)
+        # nodes that attempted already are reached but do not pass activations on
+        spreaders = samples.model.batch_spreaders()
+        if spreaders is None:
+            spreaders = np.ones(n, dtype=np.bool_)
+
+        t_indptr, t_sources, t_slots = transpose(samples.indptr, samples.indices)
+        # ranks received by every (instance, node) pair, searches stop at k
+        received = np.zeros(r * n, dtype=np.int32)
+        blocked = covered.reshape(-1)
+
+        flat = ranks.reshape(-1)
+        pairs = np.flatnonzero(~blocked)
+        pairs = pairs[np.argsort(flat[pairs], kind='stable')]
+        for start in range(0, len(pairs), batch):
+            if self.size.min() == k:
+                break
+            cells = pairs[start:start + batch]
+            cells = cells[received[cells] < k]
+            instances, nodes = np.divmod(cells, n)
+            labels = np.arange(len(cells), dtype=np.int64)
+
+            # reverse searches, one per label, each in the instance of its pair
+            seen = labels * n + nodes
+            found = [seen]
+            while len(nodes) > 0:
+                slots, owners = expand_rows(t_indptr, nodes)
+                live = samples.live(instances[labels[owners]], t_slots[slots])
+                live &= spreaders[t_sources[slots]]
+                labels, nodes = labels[owners[live]], t_sources[slots[live]]
+                targets = instances[labels] * n + nodes
+                keep = ~blocked[targets] & (received[targets] < k)
+                codes = np.unique(labels[keep] * n + nodes[keep])
+                codes = codes[~np.isin(codes, seen, assume_unique=True)]
+                seen = np.union1d(seen, codes)
+                found.append(codes)
+                labels, nodes = np.divmod(codes, n)
+
+            labels, nodes = np.divmod(np.concatenate(found), n)
+            np.add.at(received, instances[labels] * n + nodes, 1)
+
+            # labels follow the rank order: the first ones of every node fill its sketch
+            order = np.lexsort((labels, nodes))
+            labels, nodes = labels[order], nodes[order]
+            first = np.searchsorted(nodes, nodes)
+            position = np.arange(len(nodes)) - first + self.size[nodes]
+            fits = position < k
+            self.sketches[nodes[fits], position[fits]] = flat[cells[labels[fits]]]
+            self.pairs[nodes[fits], position[fits]] = cells[labels[fits]]
+            self.size += np.bincount(nodes[fits], minlength=n)
+
+    def support(self, covered=None):
+        """
+        :param covered: optional (instances x nodes) boolean matrix of the pairs covered since the sketches were built
+        :return: (nodes x k) boolean matrix of the sketch entries left uncovered
+        """
+        entries = self.pairs >= 0
+        if covered is not None:
+            entries &= ~covered.reshape(-1)[np.maximum(self.pairs, 0)]
+        return entries
+
+    def estimate(self, covered=None):
+        """
+        Estimated spread of every node, over the pairs not covered
+
+        A full sketch holds every pair of rank below its k-th rank t, each
+        with probability t: the uncovered ones among its k - 1 first entries,
+        divided by t, estimate the residual spread (k - 1 / t when no pair is
+        covered). A sketch that is not full holds every pair the node reaches.
+
+        :param covered: optional (instances x nodes) boolean matrix of the pairs covered since the sketches were built
+        :return: array with the estimated spread of every node (dense ids), averaged over the instances
+        """
+        entries = self.support(covered)
+        full = self.size == self.k
+        estimate = entries.sum(axis=1).astype(np.float64)
+        estimate[full] = entries[full, :self.k - 1].sum(axis=1) / self.sketches[full, self.k - 1]
+        return estimate / self.samples.runs
+
+
+def sketch_greedy(samples, count, k=32, batch=256):
+    """
+    Greedy seed selection on reachability sketches (SKIM)
+
+    The sketches are built once. Every round picks the node with the highest
+    estimated spread over the pairs not activated yet and marks the pairs it
+    activates in every instance; the sketch entries of those pairs are left
+    out of the next estimates instead of sketching the residual instances
+    again. The sketches are only built again (with the same ranks) once the
+    best estimate rests on fewer than three quarters of the entries it
+    started with, as thinner sketches get noisier.
+
+    :param samples: a LiveEdgeSamples object
+    :param count: number of seeds
+    :param k: sketch size
+    :param batch: number of pairs searched from at once
+    :return: (seeds, gains) lists, gains[i] being the estimated marginal gain of seeds[i]
+    """
+    r, n = samples.runs, samples.model.csr.number_of_nodes()
+    ranks = samples.model.rng.random((r, n))
+    covered = np.zeros((r, n), dtype=np.bool_)
+    sketches = ReachabilitySketches(samples, k, covered.copy(), ranks, batch)
+    spreaders = samples.model.batch_spreaders()
+    nodes = samples.model.csr.nodes
+    selected = np.zeros(n, dtype=np.bool_)
+    seeds = []
+    gains = []
+    for _ in range(min(count, n)):
+        estimate = np.where(selected, -1, sketches.estimate(covered))
+        u = int(np.argmax(estimate))
+        if sketches.size[u] == k and 4 * sketches.support(covered)[u].sum() < 3 * k:
+            sketches = ReachabilitySketches(samples, k, covered.copy(), ranks, batch)
+            estimate = np.where(selected, -1, sketches.estimate())
+            u = int(np.argmax(estimate))
+        selected[u] = True
+        seeds.append(nodes[u])
+        gains.append(float(estimate[u]))
+
+        frontier = np.zeros((r, n), dtype=np.bool_)
+        frontier[:, u] = ~covered[:, u]
+        covered[:, u] = True
+        samples.reach(covered, frontier, spreaders=spreaders)
+    return seeds, gains
+
+
+def SketchSort(g, runs=64, k=32, build=None, seed=None):
+    """
+    Sorts graph by sketch-estimated spread in descending order
+
+    Ranking strategy used as HighDegreeSort and CentralitySort are.
+
+    :param g: the graph
+    :param runs: number of live-edge instances
+    :param k: sketch size
+    :param build: function mapping (graph, seed) to a (model, config) pair, as InitModel does (default: the
+                  Independent Cascade model with its default edge threshold)
+    :param seed: seed of the model generator
+    :return: sorted list of nodes
+    """
+    if build is None:
+        from IndependentCascadesModelP010 import InitModel as build
+    model, config = build(g, seed)
+    config.add_model_initial_configuration("Infected", [])
+    model.set_initial_status(config)
+    estimate = ReachabilitySketches(LiveEdgeSamples(model, runs), k).estimate()
+    nodes = model.csr.nodes
+    return [nodes[i] for i in np.argsort(-estimate, kind='stable').tolist()]
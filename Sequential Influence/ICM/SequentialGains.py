@@ -0,0 +1,154 @@
+import numpy as np
+from NodeStatus import NodeSet
+from CSRGraph import expand_rows, transpose
+from LiveEdgeSampling import LiveEdgeSamples
+
+__license__ = "BSD-2-Clause"
+
+
+class SequentialGains(object):
+    """
+        Marginal gain of every node on top of the current model status,
+        kept up to date across the rounds of a sequential selection
+
+        Gains are estimated on a fixed set of live-edge samples through
+        reverse reachable sets: pair (instance i, root v) holds the nodes
+        that would activate v in instance i, through live edges and fresh
+        nodes only (inactive and not attempted yet: active and deactivated
+        nodes never attempt again, deactivated ones can only be reached).
+        The gain of a node is the number of pairs with an inactive root
+        that hold it, scaled to the number of nodes per instance.
+
+        Edges out of fresh nodes have never been attempted, so the samples
+        stay valid from one round to the next. A round only takes nodes out
+        of the fresh set: the update searches again the pairs that held one
+        of them, the others being unchanged.
+    """
+
+    def __init__(self, model, runs=100, roots=None):
+        """
+            Gains Constructor
+
+            :param model: a configured cascade DiffusionModel, gains are conditioned on its status
+            :param runs: number of live-edge samples
+            :param roots: number of (instance, root) pairs to draw (default: every pair, the gains are then
+                          the exact averages over the samples)
+        """
+        n = model.csr.number_of_nodes()
+        self.model = model
+        self.samples = LiveEdgeSamples(model, runs)
+        if roots is None:
+            self.instances = np.repeat(np.arange(runs, dtype=np.int64), n)
+            self.roots = np.tile(np.arange(n, dtype=np.int64), runs)
+        else:
+            self.instances = model.rng.integers(0, runs, roots)
+            self.roots = model.rng.integers(0, n, roots)
+        self.scale = n / float(max(len(self.roots), 1))
+        self.t_indptr, self.t_sources, self.t_slots = transpose(self.samples.indptr, self.samples.indices)
+
+        # reverse reachable sets, as (pair, member) entries
+        self.pairs = np.zeros(0, dtype=np.int64)
+        self.members = np.zeros(0, dtype=np.int64)
+        self.fresh = None
+        self.gains = np.zeros(n, dtype=np.float64)
+        self.update()
+
+    def __fresh(self):
+        """
+        :return: boolean array of the nodes that can still spread
+        """
+        attempt = self.model.params['nodes']['attempt']
+        attempted = np.fromiter((attempt[u] != 0 for u in self.model.csr.nodes), dtype=np.bool_,
+                                count=self.model.csr.number_of_nodes())
+        return (self.model.status.array == 0) & ~attempted
+
+    def __search(self, pairs, fresh):
+        """
+        Reverse searches from the roots of some pairs, each in its instance
+
+        :param pairs: array of pair ids
+        :param fresh: boolean array of the nodes that can spread
+        :return: (pairs, members) entries of their reverse reachable sets
+        """
+        n = len(fresh)
+        found_pairs = [np.zeros(0, dtype=np.int64)]
+        found_members = [np.zeros(0, dtype=np.int64)]
+        chunk = max(1, (1 << 24) // max(n, 1))
+        for start in range(0, len(pairs), chunk):
+            batch = pairs[start:start + chunk]
+            instances = self.instances[batch]
+            visited = np.zeros(len(batch) * n, dtype=np.bool_)
+            # position of the last write to every cell, to drop duplicates without sorting
+            stamp = np.zeros(len(batch) * n, dtype=np.int64)
+            cells = np.arange(len(batch), dtype=np.int64) * n + self.roots[batch]
+            visited[cells] = True
+            reached = [cells]
+            while len(cells) > 0:
+                labels, nodes = np.divmod(cells, n)
+                slots, owners = expand_rows(self.t_indptr, nodes)
+                labels = labels[owners]
+                live = self.samples.live(instances[labels], self.t_slots[slots])
+                labels, sources = labels[live], self.t_sources[slots[live]]
+                cells = labels * n + sources
+                cells = cells[fresh[sources] & ~visited[cells]]
+                order = np.arange(len(cells), dtype=np.int64)
+                stamp[cells] = order
+                cells = cells[stamp[cells] == order]
+                visited[cells] = True
+                reached.append(cells)
+            labels, nodes = np.divmod(np.concatenate(reached), n)
+            found_pairs.append(batch[labels])
+            found_members.append(nodes)
+        return np.concatenate(found_pairs), np.concatenate(found_members)
+
+    def update(self):
+        """
+        Bring the gains up to date with the current model status, after a
+        round of activations and deactivations
+        """
+        fresh = self.__fresh()
+        if self.fresh is None or (fresh & ~self.fresh).any():
+            # nodes can spread again (attempts were reset): every set is searched again
+            self.pairs, self.members = self.__search(np.arange(len(self.roots), dtype=np.int64), fresh)
+        else:
+            removed = self.fresh & ~fresh
+            hit = removed[self.members] & (self.members != self.roots[self.pairs])
+            stale = np.zeros(len(self.roots), dtype=np.bool_)
+            stale[self.pairs[hit]] = True
+            keep = ~stale[self.pairs]
+            pairs, members = self.__search(np.flatnonzero(stale), fresh)
+            self.pairs = np.concatenate([self.pairs[keep], pairs])
+            self.members = np.concatenate([self.members[keep], members])
+        self.fresh = fresh
+
+        valid = self.model.status.array[self.roots] == 0
+        n = len(fresh)
+        self.gains = np.bincount(self.members[valid[self.pairs]], minlength=n) * self.scale
+
+    def select(self, excluded=()):
+        """
+        :param excluded: nodes that cannot be selected (a NodeSet, or any iterable)
+        :return: the node with the highest gain (the first one in graph order on ties), None if none is left
+        """
+        allowed = np.ones(len(self.gains), dtype=np.bool_)
+        if isinstance(excluded, NodeSet):
+            allowed &= ~excluded.mask
+        else:
+            index = self.model.csr.node_index
+            allowed[[index[u] for u in excluded if u in index]] = False
+        if not allowed.any():
+            return None
+        return self.model.csr.nodes[int(np.argmax(np.where(allowed, self.gains, -np.inf)))]
+
+
+def GainSelect(activated_nodes, gains):
+    """
+    Counterpart of GreedySelect on a SequentialGains object created once
+    per run, right after the model configuration is set
+
+    :param activated_nodes: nodes that cannot be selected
+    :param gains: a SequentialGains object over the model
+    :return: the selected influencer
+    """
+    gains.update()
+    return gains.select(activated_nodes)
@@ -0,0 +1,53 @@
+import networkx as nx
+import numpy as np
+import IndependentCascadesModelP010 as p010
+from test_cascade_model import certain, run
+
+
+def deactivate(model, nodes):
+    for u in nodes:
+        model.status[u] = 0
+
+
+def test_attempted_nodes_do_not_spread():
+    g = nx.DiGraph([(0, 1), (1, 2), (1, 3), (2, 1), (3, 1)])
+    model, config = certain(p010, g)
+    run(model, config, [1])
+    deactivate(model, [1, 2])
+    model.checkpoint()
+
+    assert np.all(model.simulate_batch([0], runs=10) == 3)
+    assert np.all(model.simulate_prefixes([0], runs=10)[:, 1] == 3)
+    assert run(model, config, [0])[0] == 3
+
+
+def test_batches_match_iteration_bunch_after_deactivations():
+    g = nx.erdos_renyi_graph(80, 0.04, seed=3, directed=True)
+    model, config = certain(p010, g)
+    run(model, config, [0])
+    run(model, config, [5])
+    deactivate(model, [u for u in g.nodes if model.status[u] == 1][::2])
+    model.checkpoint()
+    for seeds in ([7], [9, 11], [0]):
+        spread = model.simulate_batch(seeds, runs=5)
+        prefixes = model.simulate_prefixes(seeds, runs=5)
+        active_set_size, _ = run(model, config, seeds)
+        model.restore()
+        assert np.all(spread == active_set_size)
+        assert np.all(prefixes[:, -1] == active_set_size)
+        assert np.all(prefixes[:, 0] == model.status.count(1))
+
+
+def test_batch_mean_matches_iteration_bunch():
+    g = nx.erdos_renyi_graph(60, 0.1, seed=4)
+    model, config = p010.InitModel(g, seed=1)
+    model.checkpoint()
+    config.add_model_initial_configuration("Infected", [0])
+    sizes = []
+    for _ in range(400):
+        model.set_initial_status(config)
+        sizes.append(model.iteration_bunch()[0])
+        model.restore()
+    spread = model.simulate_batch([0], runs=2000)
+    error = 4 * np.sqrt(np.var(sizes) / len(sizes) + np.var(spread) / len(spread))
+    assert abs(np.mean(sizes) - np.mean(spread)) <= error
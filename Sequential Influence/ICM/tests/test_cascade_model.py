@@ -0,0 +1,64 @@
+import networkx as nx
+import numpy as np
+import IndependentCascadesModelP001 as p001
+import IndependentCascadesModelP010 as p010
+import WeightedCascadeModel as wcm
+
+
+def certain(module, g, seed=0):
+    """
+    Cascade model whose edges always fire, so that a diffusion is a reachability search
+    """
+    model, config = module.InitModel(g, seed)
+    config.add_edge_array('threshold', np.ones(g.number_of_edges()))
+    return model, config
+
+
+def run(model, config, seeds):
+    config.add_model_initial_configuration("Infected", seeds)
+    model.set_initial_status(config)
+    active_set_size, activated = model.iteration_bunch()
+    model.is_reset()
+    return active_set_size, activated
+
+
+def reachable(g, seeds):
+    nodes = set(seeds)
+    for u in seeds:
+        nodes |= nx.descendants(g, u)
+    return nodes
+
+
+def test_iteration_bunch_is_reachability_when_edges_always_fire():
+    for g in (nx.erdos_renyi_graph(60, 0.03, seed=1), nx.erdos_renyi_graph(60, 0.04, seed=1, directed=True)):
+        for module in (p001, p010):
+            for seeds in ([0], [3, 7]):
+                model, config = certain(module, g)
+                active_set_size, activated = run(model, config, seeds)
+                expected = reachable(g, seeds)
+                assert active_set_size == len(expected)
+                assert set(activated) == expected - set(seeds)
+
+
+def test_weighted_cascade_is_reproducible():
+    g = nx.erdos_renyi_graph(60, 0.08, seed=2)
+    sizes = [run(*wcm.InitModel(g, seed=5), [0])[0] for _ in range(2)]
+    assert sizes[0] == sizes[1]
+
+
+def test_weighted_cascade_fires_with_the_inverse_in_degree():
+    g = nx.erdos_renyi_graph(60, 0.08, seed=2)
+    model, _ = wcm.InitModel(g)
+    degree = dict(g.degree())
+    targets = [model.csr.nodes[j] for j in model.csr.indices.tolist()]
+    assert np.allclose(model.probabilities, [1.0 / degree[v] for v in targets])
+
+    # sinks of a directed graph have no out-edge but are reached with probability 1/in-degree
+    g = nx.DiGraph([(0, 1), (2, 1), (1, 3)])
+    model, config = wcm.InitModel(g, seed=1)
+    assert np.all(np.isfinite(model.probabilities))
+    sizes = [run(*wcm.InitModel(g, seed=s), [1])[0] for s in range(5)]
+    assert sizes == [2] * 5
+    config.add_model_initial_configuration("Infected", [])
+    model.set_initial_status(config)
+    assert np.all(model.simulate_batch([1], runs=20) == 2)
@@ -0,0 +1,35 @@
+import networkx as nx
+import IndependentCascadesModelP010 as p010
+from test_cascade_model import certain, run
+
+
+def state(model):
+    return (dict(model.status), dict(model.initial_status), dict(model.params['nodes']['attempt']),
+            list(model.frontier), model.stop, model.actual_iteration, dict(model.params['status']))
+
+
+def test_restore_undoes_runs():
+    g = nx.erdos_renyi_graph(80, 0.05, seed=1, directed=True)
+    model, config = p010.InitModel(g, seed=1)
+    run(model, config, [0])
+    before = state(model)
+    model.checkpoint()
+    for seeds in ([3], [5, 9], [12]):
+        run(model, config, seeds)
+        model.restore()
+        assert state(model) == before
+    model.release()
+    assert model.journal is None
+
+
+def test_runs_from_a_checkpoint_match_fresh_models():
+    g = nx.erdos_renyi_graph(80, 0.04, seed=2, directed=True)
+    model, config = certain(p010, g)
+    run(model, config, [0])
+    model.checkpoint()
+    for seeds in ([3], [5, 9], [0, 12]):
+        fresh, fresh_config = certain(p010, g)
+        run(fresh, fresh_config, [0])
+        expected = run(fresh, fresh_config, seeds)
+        assert run(model, config, seeds) == expected
+        model.restore()
@@ -0,0 +1,76 @@
+import networkx as nx
+import IndependentCascadesModelP010 as model_module
+from EventLog import EventLog, PrintSink, read_events, SELECTION, ACTIVATION, DEACTIVATION
+from PolicyTree import get_combination
+
+
+def test_events_round_trip(tmp_path):
+    nodes = ['a', 'b', 'c', 'd']
+    index = {u: i for i, u in enumerate(nodes)}
+    path = str(tmp_path / 'events.bin')
+    with EventLog(path, index) as log:
+        log.next_round()
+        log.emit(SELECTION, seed='c')
+        log.emit(ACTIVATION, seed='c', activated=3, nodes=['a', 'd'])
+        log.next_round()
+        log.emit(DEACTIVATION, activated=2, nodes=['d'])
+    headers, ids = read_events(path, nodes)
+    assert headers['kind'].tolist() == [SELECTION, ACTIVATION, DEACTIVATION]
+    assert headers['round'].tolist() == [1, 1, 2]
+    assert headers['seed'].tolist() == [2, 2, -1]
+    assert headers['activated'].tolist() == [-1, 3, 2]
+    assert ids == [[], ['a', 'd'], ['d']]
+    assert [len(i) for i in read_events(path)[1]] == [0, 2, 1]
+
+
+def test_random_deactivation_is_logged(tmp_path):
+    g = nx.connected_watts_strogatz_graph(80, 4, 0.2, seed=1)
+    model, config = model_module.InitModel(g, seed=2)
+    config.add_model_initial_configuration("Infected", [])
+    model.set_initial_status(config)
+    path = str(tmp_path / 'events.bin')
+    model.log_events(path)
+    activated = model.activated_set(range(40))
+    deactivated = []
+    for _ in range(3):
+        before = set(activated)
+        model.events.next_round()
+        size, activated = model.random_deactivation(activated)
+        deactivated.append((sorted(before - set(activated)), size))
+    model.events.close()
+    headers, ids = read_events(path, model.csr.nodes)
+    assert headers['kind'].tolist() == [DEACTIVATION] * 3
+    assert headers['round'].tolist() == [1, 2, 3]
+    assert [(sorted(i), int(a)) for i, a in zip(ids, headers['activated'])] == deactivated
+
+
+def logged(g, seed):
+    model, config = model_module.InitModel(g, seed)
+    model.events = PrintSink()
+    return model, config
+
+
+def test_get_combination_leaves_the_sink_open(tmp_path, capsys):
+    g = nx.connected_watts_strogatz_graph(60, 4, 0.2, seed=1)
+    path = str(tmp_path / 'events.bin')
+    sinks = []
+
+    def build(g, seed):
+        model, config = model_module.InitModel(g, seed)
+        sinks.append(model.log_events(path))
+        return model, config
+
+    influencers, _ = get_combination(build, g, 3, 20, seed=4)
+    log, = sinks
+    assert not log.file.closed
+    log.close()
+    headers, ids = read_events(path, list(g.nodes))
+    selections = headers[headers['kind'] == SELECTION]
+    assert [list(g.nodes)[s] for s in selections['seed']] == influencers
+    assert headers['round'].tolist() == sorted(headers['round'].tolist())
+
+    get_combination(logged, g, 2, 20, seed=4)
+    out = capsys.readouterr().out.splitlines()
+    assert out[0].startswith("Round 1 selection: seed")
+    assert any(line.startswith("Round 2 activation") for line in out)
+    assert not any('[' in line for line in out)
@@ -0,0 +1,39 @@
+import networkx as nx
+import numpy as np
+import IndependentCascadesModelP010 as p010
+from LazyGreedy import lazy_greedy, sample_spread, LazySelect
+from LiveEdgeSampling import LiveEdgeSamples
+
+
+def plain_greedy(spread, candidates, k):
+    seeds = []
+    for _ in range(k):
+        values = [spread(seeds + [u]) if u not in seeds else -np.inf for u in candidates]
+        seeds.append(candidates[int(np.argmax(values))])
+    return seeds
+
+
+def test_lazy_greedy_matches_plain_greedy_on_coverage():
+    rng = np.random.default_rng(0)
+    sets = [set(rng.choice(50, size=rng.integers(1, 12)).tolist()) for _ in range(30)]
+
+    def spread(seeds):
+        return float(len(set().union(*[sets[u] for u in seeds])))
+    for plus in (False, True):
+        assert lazy_greedy(spread, list(range(30)), 6, plus)[0] == plain_greedy(spread, list(range(30)), 6)
+
+
+def test_exact_selection_matches_plain_greedy_on_the_samples():
+    for graph_seed in range(8):
+        g = nx.erdos_renyi_graph(60, 0.06, seed=graph_seed)
+        selected = []
+        for method in ('lazy', 'plain'):
+            model, config = p010.InitModel(g, seed=graph_seed)
+            if method == 'lazy':
+                selected.append(LazySelect(g, [], model, config, 50, k=5, exact=True))
+            else:
+                config.add_model_initial_configuration("Infected", [])
+                model.set_initial_status(config)
+                spread = sample_spread(LiveEdgeSamples(model, 50))
+                selected.append(plain_greedy(spread, list(g.nodes), 5))
+        assert selected[0] == selected[1]
@@ -0,0 +1,81 @@
+import numpy as np
+from NodeStatus import NodeStatus, NodeSet
+
+
+def check(status, reference):
+    assert dict(status) == reference
+    for s in (-1, 0, 1, 2):
+        assert status.count(s) == sum(1 for v in reference.values() if v == s)
+
+
+def test_statuses_behave_as_the_dictionary():
+    nodes = ['n%d' % i for i in range(30)]
+    status = NodeStatus(nodes, {u: i for i, u in enumerate(nodes)})
+    reference = {u: 0 for u in nodes}
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        i = int(rng.integers(0, 30))
+        s = int(rng.integers(-1, 3))
+        if rng.random() < 0.5:
+            status[nodes[i]] = s
+            reference[nodes[i]] = s
+        else:
+            ids = rng.choice(30, size=5, replace=False)
+            status.set_many(ids, s)
+            reference.update({nodes[j]: s for j in ids.tolist()})
+        check(status, reference)
+
+    status.clean([0, 1])
+    reference = {u: v if v in (0, 1) else 0 for u, v in reference.items()}
+    check(status, reference)
+    other = status.copy()
+    status.fill(1)
+    check(status, {u: 1 for u in nodes})
+    status.assign(other)
+    check(status, reference)
+
+
+def test_journal_undoes_every_change():
+    nodes = list(range(20))
+    status = NodeStatus(nodes, {u: u for u in nodes})
+    status.set_many(np.arange(0, 20, 3), 1)
+    before = dict(status)
+    status.journal = []
+    status[1] = 1
+    status.set_many(np.arange(10), -1)
+    status.fill(0)
+    status.clean([0])
+    for write, ids, old in reversed(status.journal):
+        write(ids, old)
+    status.journal = None
+    check(status, before)
+
+
+def test_node_set_behaves_as_the_set():
+    nodes = ['n%d' % i for i in range(30)]
+    members = NodeSet(nodes, {u: i for i, u in enumerate(nodes)}, nodes[:5])
+    reference = set(nodes[:5])
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        ids = rng.choice(30, size=int(rng.integers(1, 6)))
+        op = rng.integers(0, 4)
+        if op == 0:
+            members.add(nodes[ids[0]])
+            reference.add(nodes[ids[0]])
+        elif op == 1:
+            members.discard(nodes[ids[0]])
+            reference.discard(nodes[ids[0]])
+        elif op == 2:
+            members.add_many(ids)
+            reference.update(nodes[i] for i in ids.tolist())
+        else:
+            members.discard_many(ids)
+            reference.difference_update(nodes[i] for i in ids.tolist())
+        assert len(members) == len(reference)
+        assert list(members) == [u for u in nodes if u in reference]
+        assert all((u in members) == (u in reference) for u in nodes)
+        assert members.ids().tolist() == [i for i, u in enumerate(nodes) if u in reference]
+    assert 'missing' not in members
+    members.discard('missing')
+    members.extend(nodes)
+    assert len(members) == 30
@@ -0,0 +1,56 @@
+import networkx as nx
+import numpy as np
+import IndependentCascadesModelP010 as p010
+from LiveEdgeSampling import LiveEdgeSamples
+from ReachabilitySketch import ReachabilitySketches, sketch_greedy, SketchSort
+
+
+def samples_of(g, runs, seed=1):
+    model, config = p010.InitModel(g, seed)
+    config.add_edge_array('threshold', np.full(g.number_of_edges(), 0.2))
+    config.add_model_initial_configuration("Infected", [])
+    model.set_initial_status(config)
+    return LiveEdgeSamples(model, runs)
+
+
+def test_large_sketches_are_exact_spreads():
+    g = nx.erdos_renyi_graph(50, 0.06, seed=2)
+    samples = samples_of(g, 20)
+    estimate = ReachabilitySketches(samples, k=20 * 50).estimate()
+    exact = [samples.spread([u]).mean() for u in g.nodes]
+    assert np.allclose(estimate, exact)
+
+
+def test_sketch_estimates_are_close():
+    g = nx.erdos_renyi_graph(200, 0.02, seed=3)
+    samples = samples_of(g, 64)
+    estimate = ReachabilitySketches(samples, k=64).estimate()
+    exact = np.array([samples.spread([u]).mean() for u in g.nodes])
+    assert np.mean(np.abs(estimate - exact) / exact) < 0.2
+
+
+def test_sketch_greedy_with_large_sketches_is_greedy_on_the_samples():
+    g = nx.erdos_renyi_graph(50, 0.06, seed=4)
+    samples = samples_of(g, 20)
+    seeds, gains = sketch_greedy(samples, 5, k=20 * 50)
+    chosen = []
+    current = samples.spread([]).mean()
+    for seed, gain in zip(seeds, gains):
+        values = [samples.spread(chosen + [u]).mean() if u not in chosen else -1 for u in g.nodes]
+        assert values[seed] == max(values)
+        assert np.isclose(gain, values[seed] - current)
+        chosen.append(seed)
+        current = values[seed]
+
+
+def test_sketch_greedy_never_repeats_a_seed():
+    g = nx.erdos_renyi_graph(40, 0.1, seed=5)
+    seeds, _ = sketch_greedy(samples_of(g, 16), 40, k=8)
+    assert sorted(seeds) == sorted(g.nodes)
+
+
+def test_sketch_sort_ranks_the_graph():
+    g = nx.erdos_renyi_graph(60, 0.08, seed=6)
+    ranking = SketchSort(g, runs=16, k=8, seed=1)
+    assert sorted(ranking) == sorted(g.nodes)
+    assert ranking == SketchSort(g, runs=16, k=8, seed=1)
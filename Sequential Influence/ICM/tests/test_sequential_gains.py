@@ -0,0 +1,48 @@
+import networkx as nx
+import numpy as np
+import IndependentCascadesModelP010 as p010
+from SequentialGains import SequentialGains, GainSelect
+
+
+def test_gains_are_spreads_on_the_samples_across_rounds():
+    g = nx.erdos_renyi_graph(100, 0.08, seed=5, directed=True)
+    model, config = p010.InitModel(g, seed=2)
+    config.add_edge_array('threshold', np.full(g.number_of_edges(), 0.2))
+    config.add_model_initial_configuration("Infected", [])
+    model.set_initial_status(config)
+    gains = SequentialGains(model, runs=30)
+    activated = model.activated_set()
+    for _ in range(4):
+        gains.update()
+        active = model.status.count(1)
+        for u in g.nodes:
+            if u not in activated:
+                expected = gains.samples.spread([u]).mean() - active
+                assert np.isclose(gains.gains[model.csr.node_index[u]], expected)
+        model.is_reset()
+
+        influencer = GainSelect(activated, gains)
+        assert influencer not in activated
+        config.add_model_initial_configuration("Infected", [influencer])
+        model.set_initial_status(config)
+        _, new = model.iteration_bunch()
+        activated.extend(new)
+        activated.add(influencer)
+        model.random_deactivation(activated)
+        model.is_reset()
+
+
+def test_gains_match_iteration_bunch_on_average():
+    g = nx.erdos_renyi_graph(60, 0.1, seed=4)
+    model, config = p010.InitModel(g, seed=1)
+    config.add_model_initial_configuration("Infected", [])
+    model.set_initial_status(config)
+    gains = SequentialGains(model, runs=2000)
+    sizes = []
+    model.checkpoint()
+    config.add_model_initial_configuration("Infected", [0])
+    for _ in range(1000):
+        model.set_initial_status(config)
+        sizes.append(model.iteration_bunch()[0])
+        model.restore()
+    assert abs(gains.gains[model.csr.node_index[0]] - np.mean(sizes)) <= 4 * np.std(sizes) * np.sqrt(2 / 1000)
@@ -0,0 +1,126 @@
+import numpy as np
+
+__license__ = "BSD-2-Clause"
+
+# event kinds
+SELECTION = 0
+ACTIVATION = 1
+DEACTIVATION = 2
+
+KINDS = {SELECTION: "selection", ACTIVATION: "activation", DEACTIVATION: "deactivation"}
+
+# fixed-size record preceding the node ids of every event
+HEADER = np.dtype([('kind', '<u1'), ('round', '<i4'), ('seed', '<i8'), ('activated', '<i8'), ('count', '<i8')])
+
+
+class NullSink(object):
+    """
+        Event sink dropping every event, the default of the models
+
+        Models and experiment drivers report what happens through emit()
+        instead of printing it; the sink decides what to do with it.
+    """
+
+    def __init__(self):
+        """
+            Sink Constructor
+        """
+        self.round = 0
+
+    def next_round(self):
+        """
+        Start a new round (influencer selection) of a sequential run
+        """
+        self.round += 1
+
+    def emit(self, kind, seed=None, activated=-1, nodes=()):
+        """
+        Report an event of the current round
+
+        :param kind: SELECTION, ACTIVATION or DEACTIVATION
+        :param seed: influencer the event is about, if any
+        :param activated: number of active nodes after the event (-1 if not relevant)
+        :param nodes: nodes activated or deactivated by the event
+        """
+        pass
+
+    def close(self):
+        """
+        Release the resources of the sink
+        """
+        pass
+
+
+class PrintSink(NullSink):
+    """
+        Event sink printing one line per event, for interactive runs
+
+        Only the number of nodes of every event is printed, not the nodes
+        themselves: log_events() keeps them for offline analysis.
+    """
+
+    def emit(self, kind, seed=None, activated=-1, nodes=()):
+        print("Round %d %s: seed %s, %d nodes, active set size %d" %
+              (self.round, KINDS[kind], seed, len(nodes), activated))
+
+
+class EventLog(NullSink):
+    """
+        Binary event log, to analyse runs offline with read_events()
+
+        Every event is written as a HEADER record (kind, round, seed,
+        activated count, number of node ids) followed by its node ids, all
+        as little-endian integers over the dense node ids of the model.
+    """
+
+    def __init__(self, path, node_index):
+        """
+            Log Constructor
+
+            :param path: file to write, truncated
+            :param node_index: dictionary mapping each node to its dense id
+        """
+        super(EventLog, self).__init__()
+        self.node_index = node_index
+        self.file = open(path, 'wb')
+
+    def emit(self, kind, seed=None, activated=-1, nodes=()):
+        index = self.node_index
+        ids = np.fromiter((index[u] for u in nodes), dtype='<i8')
+        header = np.zeros(1, dtype=HEADER)
+        header[0] = (kind, self.round, -1 if seed is None else index[seed], activated, len(ids))
+        self.file.write(header.tobytes())
+        self.file.write(ids.tobytes())
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_events(path, nodes=None):
+    """
+    Read back a binary event log
+
+    :param path: file written by an EventLog
+    :param nodes: list of nodes in dense id order, to translate ids back (default: keep the dense ids)
+    :return: (headers, node_ids) where headers is a HEADER array (seeds as dense ids, -1 for none) and
+             node_ids the list of the node ids of every event
+    """
+    data = np.fromfile(path, dtype=np.uint8)
+    headers = []
+    node_ids = []
+    offset = 0
+    while offset < len(data):
+        header = np.frombuffer(data, dtype=HEADER, count=1, offset=offset)[0]
+        offset += HEADER.itemsize
+        ids = np.frombuffer(data, dtype='<i8', count=int(header['count']), offset=offset)
+        offset += ids.nbytes
+        headers.append(header)
+        node_ids.append(ids if nodes is None else [nodes[i] for i in ids.tolist()])
+    return np.array(headers, dtype=HEADER), node_ids
@@ -0,0 +1,155 @@
+import heapq
+import numpy as np
+from NodeStatus import NodeSet
+
+__license__ = "BSD-2-Clause"
+
+
+def lazy_greedy(spread, candidates, k, plus=True):
+    """
+    Lazy-forward greedy seed selection (CELF, or CELF++ when plus is set)
+
+    Marginal gains only shrink as the seed set grows (submodularity), so a
+    gain computed in an earlier round is an upper bound of the current one:
+    the candidates sit in a priority queue keyed by their last known gain
+    and only the top one is re-evaluated, until it is up to date. CELF++
+    also estimates, with each evaluation, the gain w.r.t. the seed set plus
+    the best candidate of the round, which spares the re-evaluation when
+    that candidate is the one picked.
+
+    Ties are broken by candidate order, as max() does in GreedySelect: for
+    a deterministic submodular spread function the seeds are the ones plain
+    greedy would pick.
+
+    :param spread: function mapping a list of seeds to their (estimated) spread
+    :param candidates: list of candidate nodes
+    :param k: number of seeds to select
+    :param plus: use the CELF++ look-ahead
+    :return: (seeds, gains) lists, gains[i] being the marginal gain of seeds[i]
+    """
+    seeds = []
+    gains = []
+    base = spread([])
+
+    # per candidate: [gain, round of the gain, best candidate when evaluated, gain after that candidate]
+    state = {}
+    queue = []
+    best = None
+    with_best = {}
+    for order, u in enumerate(candidates):
+        mg1 = spread([u]) - base
+        mg2 = mg1
+        if plus and best is not None:
+            if best not in with_best:
+                with_best[best] = spread([best])
+            mg2 = spread([best, u]) - with_best[best]
+        state[u] = [mg1, 0, best, mg2]
+        queue.append((-mg1, order, u))
+        if best is None or mg1 > state[best][0]:
+            best = u
+    heapq.heapify(queue)
+
+    last = None
+    current = base
+    with_best = {}
+    while len(seeds) < k and queue:
+        _, order, u = heapq.heappop(queue)
+        mg1, rnd, prev_best, mg2 = state[u]
+        if rnd == len(seeds):
+            seeds.append(u)
+            gains.append(mg1)
+            current += mg1
+            last = u
+            best = None
+            with_best = {}
+            continue
+
+        if plus and rnd == len(seeds) - 1 and prev_best is not None and prev_best == last:
+            mg1 = mg2
+        else:
+            mg1 = spread(seeds + [u]) - current
+        mg2 = mg1
+        if plus and best is not None:
+            if best not in with_best:
+                with_best[best] = spread(seeds + [best])
+            mg2 = spread(seeds + [best, u]) - with_best[best]
+        state[u] = [mg1, len(seeds), best, mg2]
+        if best is None or mg1 > state[best][0]:
+            best = u
+        heapq.heappush(queue, (-mg1, order, u))
+
+    return seeds, gains
+
+
+def greedy(spread, candidates, k):
+    """
+    Plain greedy seed selection, every candidate evaluated again in every round
+
+    :param spread: function mapping a list of seeds to their (estimated) spread
+    :param candidates: list of candidate nodes
+    :param k: number of seeds to select
+    :return: (seeds, gains) lists, gains[i] being the marginal gain of seeds[i]
+    """
+    seeds = []
+    gains = []
+    current = spread([])
+    left = list(candidates)
+    while len(seeds) < k and left:
+        values = [spread(seeds + [u]) for u in left]
+        best = int(np.argmax(values))
+        seeds.append(left.pop(best))
+        gains.append(values[best] - current)
+        current = values[best]
+    return seeds, gains
+
+
+def model_spread(model, runs=100):
+    """
+    Spread estimator on top of the current model status
+
+    With the configured thresholds every realization is the same, so a
+    single one is run per estimate.
+
+    :param model: a configured DiffusionModel
+    :param runs: number of realizations per estimate, when they are random
+    :return: function mapping a list of seeds to their average final active set size
+    """
+    kernel = model.batch_kernel()
+    if kernel.thresholds is not None:
+        runs = 1
+
+    def spread(seeds):
+        return float(model.simulate_batch(seeds, runs, kernel).mean())
+    return spread
+
+
+def LazySelect(g, activated_nodes, model, config, greedy_i, k=1, exact=False):
+    """
+    Lazy-greedy counterpart of GreedySelect
+
+    Selects the k nodes with highest marginal gain among those not in
+    activated_nodes, each marginal gain being averaged over greedy_i batched
+    simulations started from the current model status (a single one with
+    the configured thresholds, see model_spread).
+
+    :param g: the graph
+    :param activated_nodes: nodes that cannot be selected (a NodeSet, or any iterable)
+    :param model: a DiffusionModel
+    :param config: its Configuration
+    :param greedy_i: number of simulations per estimate
+    :param k: number of influencers to select
+    :param exact: evaluate every candidate again in every round, as GreedySelect does: with the configured
+                  thresholds the spread is deterministic but not submodular, so lazy evaluation can pick
+                  other seeds
+    :return: the selected influencer if k == 1, the list of selected influencers otherwise
+    """
+    config.add_model_initial_configuration("Infected", [])
+    model.set_initial_status(config)
+    excluded = activated_nodes if isinstance(activated_nodes, NodeSet) else set(activated_nodes)
+    candidates = [n for n in g.nodes() if n not in excluded]
+    spread = model_spread(model, greedy_i)
+    if exact:
+        seeds, _ = greedy(spread, candidates, k)
+    else:
+        seeds, _ = lazy_greedy(spread, candidates, k)
+    return seeds[0] if k == 1 else seeds
@@ -1,4 +1,6 @@
+import numpy as np
 import future.utils
+from DiffusionModel import ConfigurationException
 
 __author__ = 'Giulio Rossetti'
 __license__ = "BSD-2-Clause"
@@ -9,6 +11,10 @@ class Configuration(object):
     """
     Configuration Object
 
+    Every change to the node, edge or model parameters made through the add_*
+    methods bumps the version and records it against the parameter, telling
+    the models which parameters to load again; the initial status can change
+    without doing so.
     """
 
     def __init__(self):
@@ -18,6 +24,12 @@ class Configuration(object):
             'model': {},
             'status': {}
         }
+        self.version = 0
+        self.modified = {}
+
+    def __modify(self, kind, param_name):
+        self.version += 1
+        self.modified[(kind, param_name)] = self.version
 
     def get_nodes_configuration(self):
         """
@@ -59,6 +71,7 @@ class Configuration(object):
         :param param_value: parameter value
         """
         self.config['model'][param_name] = param_value
+        self.__modify('model', param_name)
 
     def add_model_initial_configuration(self, status_name, nodes):
         """
@@ -76,22 +89,44 @@ class Configuration(object):
         :param param_name: parameter identifier (as specified by the chosen model)
         :param node_id: node identifier
         :param param_value: parameter value
+        :raises ConfigurationException: if the parameter was set from an array
         """
+        if isinstance(self.config['nodes'].get(param_name), np.ndarray):
+            raise ConfigurationException({"message": "Node array parameter cannot be updated per node",
+                                          "parameters": {param_name}})
         if param_name not in self.config['nodes']:
             self.config['nodes'][param_name] = {node_id: param_value}
         else:
             self.config['nodes'][param_name][node_id] = param_value
+        self.__modify('nodes', param_name)
 
     def add_node_set_configuration(self, param_name, node_to_value):
         """
         Set Nodes parameter
 
         :param param_name: parameter identifier (as specified by the chosen model)
-        :param node_to_value: dictionary mapping each node a parameter value
+        :param node_to_value: dictionary mapping each node a parameter value,
+                              replacing the whole parameter if it was set from an array
         """
+        if isinstance(self.config['nodes'].get(param_name), np.ndarray):
+            del self.config['nodes'][param_name]
         for nid, val in future.utils.iteritems(node_to_value):
             self.add_node_configuration(param_name, nid, val)
 
+    def add_node_array(self, param_name, values):
+        """
+        Set Nodes parameter from an array
+
+        The array is handed over to the models as it is (no copy when it
+        already holds float64 values), in place of a dictionary: it has to
+        follow the order of graph.nodes, and cannot be updated per node.
+
+        :param param_name: parameter identifier (as specified by the chosen model)
+        :param values: array holding the value of every node, in graph.nodes order
+        """
+        self.config['nodes'][param_name] = np.asarray(values, dtype=np.float64)
+        self.__modify('nodes', param_name)
+
     def add_edge_configuration(self, param_name, edge, param_value):
         """
         Set a parameter for a given edge
@@ -99,18 +134,40 @@ class Configuration(object):
         :param param_name: parameter identifier (as specified by the chosen model)
         :param edge: edge identifier
         :param param_value: parameter value
+        :raises ConfigurationException: if the parameter was set from an array
         """
+        if isinstance(self.config['edges'].get(param_name), np.ndarray):
+            raise ConfigurationException({"message": "Edge array parameter cannot be updated per edge",
+                                          "parameters": {param_name}})
         if param_name not in self.config['edges']:
             self.config['edges'][param_name] = {edge: param_value}
         else:
             self.config['edges'][param_name][edge] = param_value
+        self.__modify('edges', param_name)
 
     def add_edge_set_configuration(self, param_name, edge_to_value):
         """
         Set Edges parameter
 
         :param param_name: parameter identifier (as specified by the chosen model)
-        :param edge_to_value: dictionary mapping each edge a parameter value
+        :param edge_to_value: dictionary mapping each edge a parameter value,
+                              replacing the whole parameter if it was set from an array
         """
+        if isinstance(self.config['edges'].get(param_name), np.ndarray):
+            del self.config['edges'][param_name]
         for edge, val in future.utils.iteritems(edge_to_value):
             self.add_edge_configuration(param_name, edge, val)
+
+    def add_edge_array(self, param_name, values):
+        """
+        Set Edges parameter from an array
+
+        The array is handed over to the models as it is (no copy when it
+        already holds float64 values), in place of a dictionary: it has to
+        follow the order of graph.edges, and cannot be updated per edge.
+
+        :param param_name: parameter identifier (as specified by the chosen model)
+        :param values: array holding the value of every edge, in graph.edges order
+        """
+        self.config['edges'][param_name] = np.asarray(values, dtype=np.float64)
+        self.__modify('edges', param_name)
@@ -0,0 +1,204 @@
+import numpy as np
+from bisect import bisect_left, insort
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from EventLog import SELECTION, ACTIVATION
+from SequentialGains import SequentialGains, GainSelect
+
+__license__ = "BSD-2-Clause"
+
+# per worker process: the model builder, the graph and the run settings
+_worker = {}
+
+
+def _attach(build, g, target_set_size, greedy_i, entropy):
+    _worker['build'] = build
+    _worker['g'] = g
+    _worker['target_set_size'] = target_set_size
+    _worker['greedy_i'] = greedy_i
+    _worker['entropy'] = entropy
+
+
+def _combination(index, build=None, g=None, target_set_size=None, greedy_i=None, entropy=None):
+    """
+    Run one combination of the reference, on its own random stream
+
+    :param index: combination index, also the spawn key of its stream
+    :return: (index, influencers, reward)
+    """
+    if build is None:
+        build, g = _worker['build'], _worker['g']
+        target_set_size, greedy_i, entropy = _worker['target_set_size'], _worker['greedy_i'], _worker['entropy']
+    seed = np.random.SeedSequence(entropy, spawn_key=(index,))
+    influencers, reward = get_combination(build, g, target_set_size, greedy_i, seed)
+    return index, influencers, reward
+
+
+def get_combination(build, g, target_set_size, greedy_i=100, seed=None):
+    """
+    Counterpart of the notebooks' get_combination: one sequential run with
+    greedy selection, random deactivation after every influencer
+
+    Influencers are selected on a SequentialGains engine created once for
+    the run, whose gains are exact, instead of greedy_i fresh simulations
+    per candidate and round.
+    Selections and activations are reported to model.events, left open for
+    whoever set it up to close.
+
+    :param build: function mapping (graph, seed) to a configured (model, config) pair, as InitModel does
+    :param g: the graph, without isolated nodes
+    :param target_set_size: number of influencers to select
+    :param greedy_i: unused with exact gains, kept for the notebooks' signature
+    :param seed: seed of the run, handed over to build
+    :return: (influencers, active set size at the end of the run)
+    """
+    model, config = build(g, seed)
+    config.add_model_initial_configuration("Infected", [])
+    model.set_initial_status(config)
+    gains = SequentialGains(model)
+
+    activated_nodes = model.activated_set()
+    influencers = []
+    active_set_size = 0
+    for _ in range(target_set_size):
+        model.events.next_round()
+        influencer = GainSelect(activated_nodes, gains)
+        influencers.append(influencer)
+        model.events.emit(SELECTION, seed=influencer)
+
+        config.add_model_initial_configuration("Infected", [influencer])
+        model.set_initial_status(config)
+        active_set_size, newly_activated_nodes = model.iteration_bunch()
+        activated_nodes.extend(newly_activated_nodes)
+        activated_nodes.add(influencer)
+        model.events.emit(ACTIVATION, seed=influencer, activated=len(activated_nodes), nodes=newly_activated_nodes)
+
+        active_set_size, activated_nodes = model.random_deactivation(activated_nodes)
+        model.is_reset()
+
+    return influencers, active_set_size
+
+
+class PolicyTree(object):
+    """
+        'Policy Tree' reference: combinations of influencers ranked by
+        their reward, the active set size at the end of the run
+
+        Combinations are independent runs of get_combination, each on its
+        own random stream (spawned from the seed of the tree by combination
+        index), so they can run in any order across worker processes and
+        still give the same reference. Results are merged as they finish:
+        sorted_influencers() and LT_ref() can be read at any time and are,
+        once every combination is in, the lists the notebooks build.
+    """
+
+    def __init__(self, build, g, target_set_size, greedy_i=100, processes=None, seed=None):
+        """
+            Tree Constructor
+
+            :param build: function mapping (graph, seed) to a configured (model, config) pair, as InitModel does,
+                          defined at module level so that worker processes can run it
+            :param g: the graph, without isolated nodes
+            :param target_set_size: number of influencers of every combination
+            :param greedy_i: unused with exact gains, kept for the notebooks' signature
+            :param processes: number of worker processes (default: one per CPU, 1: run in this process)
+            :param seed: seed of the tree (default: fresh entropy)
+        """
+        self.build = build
+        self.g = g
+        self.target_set_size = target_set_size
+        self.greedy_i = greedy_i
+        self.processes = processes
+        self.entropy = np.random.SeedSequence(seed).entropy
+
+        # one entry per finished combination, by index
+        self.results = {}
+        self.next_index = 0
+        # (-reward, index) of every combination, and of the best one per distinct combination
+        self.ranking = []
+        self.best = {}
+        self.distinct = []
+
+    def __len__(self):
+        return len(self.results)
+
+    def add(self, index, influencers, reward):
+        """
+        Merge the result of a combination
+
+        Combinations are ranked by decreasing reward, then by index as the
+        notebooks' stable sort does; a combination met several times keeps
+        its best rank only in sorted_influencers().
+
+        :param index: combination index
+        :param influencers: list of influencers
+        :param reward: active set size
+        """
+        key = (-reward, index)
+        self.results[index] = (list(influencers), reward)
+        insort(self.ranking, key)
+        combination = tuple(influencers)
+        previous = self.best.get(combination)
+        if previous is None or key < previous:
+            if previous is not None:
+                del self.distinct[bisect_left(self.distinct, previous)]
+            self.best[combination] = key
+            insort(self.distinct, key)
+
+    def run(self, num_i):
+        """
+        Run num_i more combinations, yielding them as they finish
+
+        Stopping the iteration early cancels the combinations not started yet.
+
+        :param num_i: number of combinations to run
+        :return: generator of (index, influencers, reward), in completion order
+        """
+        indices = range(self.next_index, self.next_index + num_i)
+        self.next_index += num_i
+        if self.processes == 1:
+            for index in indices:
+                result = _combination(index, self.build, self.g, self.target_set_size, self.greedy_i, self.entropy)
+                self.add(*result)
+                yield result
+            return
+
+        pool = ProcessPoolExecutor(max_workers=self.processes, initializer=_attach,
+                                   initargs=(self.build, self.g, self.target_set_size, self.greedy_i, self.entropy))
+        try:
+            for future in as_completed([pool.submit(_combination, index) for index in indices]):
+                result = future.result()
+                self.add(*result)
+                yield result
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+    def LT_ref(self):
+        """
+        :return: list of (influencers, reward) of the finished combinations, by decreasing reward
+        """
+        return [self.results[index] for _, index in self.ranking]
+
+    def sorted_influencers(self):
+        """
+        :return: list of the distinct combinations finished so far, by decreasing reward
+        """
+        return [list(self.results[index][0]) for _, index in self.distinct]
+
+
+def BuildReference(build, g, target_set_size, greedy_i, num_i, processes=None, seed=None):
+    """
+    Counterpart of the notebooks' 'Policy Tree' reference loop, over worker processes
+
+    :param build: function mapping (graph, seed) to a configured (model, config) pair, as InitModel does
+    :param g: the graph, without isolated nodes
+    :param target_set_size: number of influencers of every combination
+    :param greedy_i: unused with exact gains, kept for the notebooks' signature
+    :param num_i: number of combinations
+    :param processes: number of worker processes (default: one per CPU)
+    :param seed: seed of the reference
+    :return: (LT_ref, sorted_influencers)
+    """
+    tree = PolicyTree(build, g, target_set_size, greedy_i, processes, seed)
+    for _ in tree.run(num_i):
+        pass
+    return tree.LT_ref(), tree.sorted_influencers()
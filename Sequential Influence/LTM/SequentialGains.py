@@ -0,0 +1,124 @@
+import numpy as np
+from NodeStatus import NodeSet
+from CSRGraph import expand_rows
+
+__license__ = "BSD-2-Clause"
+
+
+class SequentialGains(object):
+    """
+        Marginal gain of every node on top of the current model status,
+        kept up to date across the rounds of a sequential selection
+
+        With the configured thresholds a Linear Threshold diffusion is
+        deterministic: the gain of a node is the number of nodes active once
+        the diffusion from the current status plus that node stops, minus
+        those active now. The diffusion from the status alone (the base)
+        is shared by all the nodes; what every node adds on top of it is
+        computed at once with the batch kernel, one row per node.
+
+        A round changes the base on a set of nodes, and with it the weight
+        accumulated by their neighbours. The addition of a node can only
+        change if the node, or one of the nodes it adds, is among them or
+        pushes weight onto them: the update computes those nodes again.
+
+        What every node adds is kept as (row, member) entries, so memory
+        grows with the total size of the additions rather than with the
+        square of the number of nodes.
+    """
+
+    def __init__(self, model):
+        """
+            Gains Constructor
+
+            :param model: a configured ThresholdModel, gains are conditioned on its status
+        """
+        n = model.csr.number_of_nodes()
+        self.model = model
+        self.kernel = model.batch_kernel()
+        self.base = None
+        # entry j: node members[j] is added to the base by the diffusion from the base plus node rows[j]
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.members = np.zeros(0, dtype=np.int64)
+        self.gains = np.zeros(n, dtype=np.float64)
+        self.update()
+
+    def __diffuse(self, base, nodes):
+        """
+        :param base: boolean array of the base active set, a fixed point of the diffusion
+        :param nodes: dense ids of the nodes to add, one row each
+        :return: (rows, members) entries of the nodes every row adds
+        """
+        n = len(base)
+        found_rows = [np.zeros(0, dtype=np.int64)]
+        found_members = [np.zeros(0, dtype=np.int64)]
+        chunk = max(1, (1 << 24) // max(n, 1))
+        for start in range(0, len(nodes), chunk):
+            rows = nodes[start:start + chunk]
+            state = np.tile(base, (len(rows), 1))
+            state[np.arange(len(rows)), rows] = True
+            self.kernel.run(state, state.copy(), self.model.rng)
+            labels, members = np.nonzero(state & ~base)
+            found_rows.append(rows[labels])
+            found_members.append(members)
+        return np.concatenate(found_rows), np.concatenate(found_members)
+
+    def update(self):
+        """
+        Bring the gains up to date with the current model status, after a
+        round of activations and deactivations
+        """
+        model = self.model
+        active = model.status.array == 1
+        base = active[None, :].copy()
+        base = self.kernel.run(base, base.copy(), model.rng)[0]
+
+        if self.base is None:
+            stale = np.ones(len(base), dtype=np.bool_)
+        else:
+            # changed nodes and the nodes whose accumulated weight changed with them
+            zone = base != self.base
+            zone[model.out_targets[expand_rows(model.out_indptr, np.flatnonzero(zone))[0]]] = True
+            # and the nodes that push weight onto them
+            near = zone.copy()
+            near[model.in_indices[expand_rows(model.in_indptr, np.flatnonzero(zone))[0]]] = True
+            stale = near.copy()
+            stale[self.rows[near[self.members]]] = True
+        self.base = base
+
+        keep = ~stale[self.rows]
+        rows, members = self.__diffuse(base, np.flatnonzero(stale & ~base))
+        self.rows = np.concatenate([self.rows[keep], rows])
+        self.members = np.concatenate([self.members[keep], members])
+
+        # nodes activated by the diffusion from the status alone count for every node
+        n = len(base)
+        self.gains = np.bincount(self.rows, minlength=n) + float(base.sum() - active.sum())
+
+    def select(self, excluded=()):
+        """
+        :param excluded: nodes that cannot be selected (a NodeSet, or any iterable)
+        :return: the node with the highest gain (the first one in graph order on ties), None if none is left
+        """
+        allowed = np.ones(len(self.gains), dtype=np.bool_)
+        if isinstance(excluded, NodeSet):
+            allowed &= ~excluded.mask
+        else:
+            index = self.model.csr.node_index
+            allowed[[index[u] for u in excluded if u in index]] = False
+        if not allowed.any():
+            return None
+        return self.model.csr.nodes[int(np.argmax(np.where(allowed, self.gains, -np.inf)))]
+
+
+def GainSelect(activated_nodes, gains):
+    """
+    Counterpart of GreedySelect on a SequentialGains object created once
+    per run, right after the model configuration is set
+
+    :param activated_nodes: nodes that cannot be selected
+    :param gains: a SequentialGains object over the model
+    :return: the selected influencer
+    """
+    gains.update()
+    return gains.select(activated_nodes)
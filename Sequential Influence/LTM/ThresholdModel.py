@@ -1,5 +1,8 @@
-from DiffusionModel import DiffusionModel
-import future.utils
+from DiffusionModel import DiffusionModel, ConfigurationException
+from ModelConfig import Configuration
+from BatchSimulation import ThresholdKernel
+from CSRGraph import expand_rows, transpose
+import numpy as np
 
 __author__ = "Giulio Rossetti"
 __license__ = "BSD-2-Clause"
@@ -47,53 +50,232 @@ class ThresholdModel(DiffusionModel):
 
         self.name = "Threshold"
 
+        self.in_indptr, self.in_indices, self.in_edge_ids = self.__in_edge_index()
+        self.has_predecessors = np.diff(self.csr.transpose()[0]) > 0
+
+        # the same entries grouped by neighbour, to push the weight of a node onto the nodes it counts for
+        self.out_indptr, self.out_targets, self.out_entries = transpose(self.in_indptr, self.in_indices)
+
+        # incremental accumulator: active in-weight of every node, valid for the active set in self.pushed
+        self.accumulated = None
+        self.pushed = None
+        self.__weights = None
+        self.__thresholds = None
+        self.__zero_thresholds = None
+
+        # double buffer of the status: iteration() fills it from self.status and swaps the two
+        self.next_status = self.status.copy()
+        self.__active = np.zeros(self.csr.number_of_nodes(), dtype=np.bool_)
+        self.__saved = None
+
+    def __in_edge_index(self):
+        """
+        Build the in-edge index read by iteration()
+
+        Row u lists the neighbours (predecessors for directed graphs) whose
+        weight counts towards u's threshold, i.e. those for which the edge
+        (u, neighbour) appears in graph.edges, together with the position of
+        that edge so the configured weights can be laid out along the entries.
+
+        :return: (indptr, indices, edge_ids) arrays over the dense node ids
+        """
+        n = self.csr.number_of_nodes()
+        index = self.csr.node_index
+        edges = self.csr.edges
+        rows = np.fromiter((index[e[0]] for e in edges), dtype=np.int64, count=len(edges))
+        cols = np.fromiter((index[e[1]] for e in edges), dtype=np.int64, count=len(edges))
+        eid = np.arange(len(edges), dtype=np.int64)
+
+        if self.graph.directed:
+            # the neighbour must also be a predecessor of u
+            slots = self.csr.sources() * n + self.csr.indices
+            keep = np.isin(cols * n + rows, slots)
+            rows, cols, eid = rows[keep], cols[keep], eid[keep]
+
+        _, first = np.unique(rows * n + cols, return_index=True)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows[first], minlength=n), out=indptr[1:])
+        return indptr, cols[first], eid[first]
+
+    def in_weights(self):
+        """
+        Configured edge weights laid out along the in-edge index
+
+        :return: float array with one weight per entry of self.in_indices
+        """
+        if 'weight' not in self.edge_arrays:
+            weight = self.params['edges']['weight']
+            if isinstance(weight, np.ndarray):
+                self.edge_arrays['weight'] = weight[self.in_edge_ids]
+            else:
+                edges = self.csr.edges
+                self.edge_arrays['weight'] = np.array([weight[edges[e]] for e in self.in_edge_ids.tolist()],
+                                                      dtype=np.float64)
+        return self.edge_arrays['weight']
+
+    def accumulate(self, active):
+        """
+        Bring the accumulated active in-weights up to date with an active set
+
+        Only the nodes whose status differs from the last call push (or pull
+        back) their weight; the accumulator is rebuilt from scratch when the
+        edge weights are reconfigured.
+
+        :param active: boolean array over the dense node ids
+        :return: dense ids of the nodes whose accumulated weight or status changed
+        """
+        weights = self.in_weights()
+        if self.__weights is not weights:
+            n = self.csr.number_of_nodes()
+            self.accumulated = np.zeros(n, dtype=np.float64)
+            self.pushed = np.zeros(n, dtype=np.bool_)
+            self.__weights = weights
+
+        changed = np.flatnonzero(active != self.pushed)
+        slots, owners = expand_rows(self.out_indptr, changed)
+        entries = self.out_entries[slots]
+        targets = self.out_targets[slots]
+        sign = np.where(active[changed], 1.0, -1.0)
+        if self.journal is not None:
+            touched = np.unique(targets)
+            self.journal.append((self.accumulated.__setitem__, touched, self.accumulated[touched]))
+            self.journal.append((self.pushed.__setitem__, changed, self.pushed[changed]))
+        np.add.at(self.accumulated, targets, sign[owners] * weights[entries])
+        self.pushed[changed] = active[changed]
+
+        return np.union1d(targets, changed)
+
+    def checkpoint(self):
+        """
+        Start recording the changes made to the model state, see DiffusionModel.checkpoint
+
+        The accumulated in-weights and the spare status buffer are recorded
+        too, so that restore() brings back the exact accumulator state.
+        """
+        super(self.__class__, self).checkpoint()
+        self.next_status.journal = self.journal
+        self.__saved = (self.next_status, self.accumulated, self.pushed, self.__weights,
+                        self.__thresholds, self.__zero_thresholds)
+
+    def restore(self):
+        """
+        Undo every change made since the last checkpoint(), which stays active
+        """
+        super(self.__class__, self).restore()
+        (self.next_status, self.accumulated, self.pushed, self.__weights,
+         self.__thresholds, self.__zero_thresholds) = self.__saved
+
+    def release(self):
+        """
+        Stop recording changes, keeping the current state
+        """
+        self.next_status.journal = None
+        super(self.__class__, self).release()
+        self.__saved = None
+
     def iteration(self, node_status=True):
         """
         Execute a single model iteration
 
+        Only the nodes whose active in-weight changed since the previous
+        iteration are compared against their threshold. The next status is
+        written into the spare status buffer, which then replaces the
+        current one: no per-step copy of the status is allocated.
+
         :return: Iteration_id, Incremental node status (dictionary node->status)
         """
-        
         self.clean_initial_status(list(self.available_statuses.values()))
-        actual_status = {node: nstatus for node, nstatus in future.utils.iteritems(self.status)}
-
-        for u in self.graph.nodes:
-            neighbors = []
-
-            if actual_status[u] == 1:
-                continue
-            
-            neighbors = list(self.graph.neighbors(u))
-
-            if self.graph.directed:
-                neighbors = list(self.graph.predecessors(u))
-
-            # activate if the total weight of its ACTIVE neighbours is at least threshold
-            if len(neighbors) > 0:
-                total_weight = 0
-
-                for neighbor in neighbors:
-
-                    # find active neighbours
-                    if self.status[neighbor] == 1: 
-                        # print(u, neighbor)
-                        if (u, neighbor) in list(self.graph.edges): 
-                            total_weight += self.params['edges']['weight'][(u, neighbor)] 
-                
-                # compare total weight with threshold
-                if total_weight >= self.params['nodes']['threshold'][u]: 
-                    actual_status[u] = 1
-                
-        delta, node_count, status_delta = self.status_delta(actual_status)
-        self.status = actual_status
+        actual_status = self.next_status
+        actual_status.assign(self.status)
+
+        nodes = self.csr.nodes
+        n = len(nodes)
+        active = np.equal(self.status.array, 1, out=self.__active)
+        candidates = self.accumulate(active)
+
+        threshold = self.node_array('threshold')
+        if self.__thresholds is not threshold:
+            # new thresholds: every node has to be checked once
+            self.__thresholds = threshold
+            candidates = np.arange(n)
+            self.__zero_thresholds = np.flatnonzero(self.has_predecessors & (threshold <= 0))
+        candidates = np.union1d(candidates, self.__zero_thresholds)
+
+        # activate if the total weight of its ACTIVE neighbours is at least threshold
+        # (nodes without predecessors never do)
+        activated = candidates[~active[candidates] & self.has_predecessors[candidates] &
+                               (self.accumulated[candidates] >= threshold[candidates])]
+        actual_status.set_many(activated, 1)
+        delta = {nodes[i]: 1 for i in activated.tolist()}
+        # only the nodes activated by this iteration are pending, as in the cascade models
+        self.frontier = list(delta)
+
+        self.status, self.next_status = actual_status, self.status
         self.actual_iteration += 1
-        for key in status_delta: 
-            if status_delta[key] != 0: 
-                self.stop = False
-            else: 
-                self.stop = True
+        self.stop = len(delta) == 0
 
-        active_set_size = node_count.copy()[1]
+        active_set_size = actual_status.count(1)
         status = delta.copy()
         
         return active_set_size, status
+
+    def batch_kernel(self, resample_thresholds=False):
+        """
+        Batched counterpart of the model iteration
+
+        :param resample_thresholds: draw uniform thresholds for every realization instead of the configured ones
+        :return: a ThresholdKernel over the configured weights
+        """
+        thresholds = None if resample_thresholds else self.node_array('threshold')
+        weights = self.in_weights()[self.out_entries]
+        return ThresholdKernel(self.out_indptr, self.out_targets, weights, self.has_predecessors, thresholds)
+
+
+def normalized_weights(csr):
+    """
+    Edge weights of the Linear Threshold setup used in the notebooks
+
+    Edge (v, w) weighs its multiplicity, plus that of (w, v), divided by the
+    number of neighbours of w, as computed by the notebooks' InitModel, but
+    in one pass over the edge list.
+
+    :param csr: CSRGraph snapshot of the graph
+    :return: float array with one weight per edge, in graph.edges order
+    """
+    n = csr.number_of_nodes()
+    m = len(csr.edges)
+    if m == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    index = csr.node_index
+    src = np.fromiter((index[e[0]] for e in csr.edges), dtype=np.int64, count=m)
+    dst = np.fromiter((index[e[1]] for e in csr.edges), dtype=np.int64, count=m)
+    codes, counts = np.unique(src * n + dst, return_counts=True)
+    multiplicity = counts[np.searchsorted(codes, src * n + dst)]
+
+    reverse = dst * n + src
+    position = np.minimum(np.searchsorted(codes, reverse), len(codes) - 1)
+    multiplicity = multiplicity + np.where(codes[position] == reverse, counts[position], 0)
+
+    degree = csr.out_degree()[dst]
+    if np.any(degree == 0):
+        raise ConfigurationException({"message": "Edge weights undefined for targets without neighbours"})
+    return multiplicity / degree
+
+
+def InitModel(g, seed=None):
+    """
+    Vectorized counterpart of the notebooks' InitModel
+
+    Thresholds are drawn uniformly in bulk from the model generator, in
+    graph.nodes order, and both parameters are handed over as arrays.
+
+    :param g: the graph
+    :param seed: seed of the model generator, and so of the thresholds
+    :return: (model, config) with 'threshold' and 'weight' configured
+    """
+    model = ThresholdModel(g, seed)
+    config = Configuration()
+    config.add_node_array('threshold', model.rng.random(model.csr.number_of_nodes()))
+    config.add_edge_array('weight', normalized_weights(model.csr))
+    return model, config
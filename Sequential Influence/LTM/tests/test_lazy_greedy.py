@@ -0,0 +1,39 @@
+import networkx as nx
+import numpy as np
+import ThresholdModel as tm
+from LazyGreedy import lazy_greedy, greedy, model_spread, LazySelect
+
+
+def test_lazy_greedy_matches_plain_greedy_on_coverage():
+    rng = np.random.default_rng(0)
+    sets = [set(rng.choice(50, size=rng.integers(1, 12)).tolist()) for _ in range(30)]
+
+    def spread(seeds):
+        return float(len(set().union(*[sets[u] for u in seeds])))
+    for plus in (False, True):
+        assert lazy_greedy(spread, list(range(30)), 6, plus)[0] == greedy(spread, list(range(30)), 6)[0]
+
+
+def test_exact_selection_is_plain_greedy():
+    g = nx.connected_watts_strogatz_graph(60, 4, 0.2, seed=1)
+    model, config = tm.InitModel(g, seed=2)
+    selected = LazySelect(g, [0, 1], model, config, 1, k=4, exact=True)
+    spread = model_spread(model, 1)
+    values = {u: spread([u]) for u in g.nodes if u not in (0, 1)}
+    assert selected[0] == max(values, key=values.get)
+    assert selected == greedy(spread, [u for u in g.nodes if u not in (0, 1)], 4)[0]
+    assert len(set(selected)) == 4
+
+
+def test_fixed_thresholds_run_once(monkeypatch):
+    g = nx.connected_watts_strogatz_graph(60, 4, 0.2, seed=1)
+    model, config = tm.InitModel(g, seed=2)
+    config.add_model_initial_configuration("Infected", [])
+    model.set_initial_status(config)
+    calls = []
+    simulate_batch = model.simulate_batch
+    monkeypatch.setattr(model, 'simulate_batch', lambda seeds, runs, kernel: calls.append(runs) or
+                        simulate_batch(seeds, runs, kernel))
+    spread = model_spread(model, 100)
+    assert spread([0]) == float(simulate_batch([0], 100).mean())
+    assert calls == [1]
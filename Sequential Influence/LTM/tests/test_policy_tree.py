@@ -0,0 +1,46 @@
+import networkx as nx
+import ThresholdModel as model_module
+from PolicyTree import PolicyTree, BuildReference
+
+
+def graph():
+    return nx.connected_watts_strogatz_graph(50, 4, 0.2, seed=1)
+
+
+def notebook_reference(results):
+    LT_ref = list(results)
+    LT_ref.sort(key=lambda x: x[1], reverse=True)
+    sorted_influencers = []
+    for influencers, LT_reward in LT_ref:
+        if influencers in sorted_influencers:
+            continue
+        sorted_influencers.append(influencers)
+    return LT_ref, sorted_influencers
+
+
+def test_reference_does_not_depend_on_the_processes():
+    g = graph()
+    serial = BuildReference(model_module.InitModel, g, 3, 20, 8, processes=1, seed=5)
+    parallel = BuildReference(model_module.InitModel, g, 3, 20, 8, processes=3, seed=5)
+    assert serial == parallel
+
+
+def test_reference_matches_the_notebook_ranking():
+    tree = PolicyTree(model_module.InitModel, graph(), 2, 20, processes=1, seed=5)
+    results = [(influencers, reward) for _, influencers, reward in tree.run(12)]
+    LT_ref, sorted_influencers = notebook_reference(results)
+    assert tree.LT_ref() == LT_ref
+    assert tree.sorted_influencers() == sorted_influencers
+
+
+def test_partial_reads():
+    tree = PolicyTree(model_module.InitModel, graph(), 2, 20, processes=2, seed=5)
+    finished = {}
+    for index, influencers, reward in tree.run(6):
+        finished[index] = (influencers, reward)
+        assert len(tree) == len(finished)
+        assert tree.LT_ref() == notebook_reference([finished[i] for i in sorted(finished)])[0]
+    for _ in tree.run(4):
+        pass
+    assert sorted(tree.results) == list(range(10))
+    assert tree.sorted_influencers() == notebook_reference([tree.results[i] for i in range(10)])[1]
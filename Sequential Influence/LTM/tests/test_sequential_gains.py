@@ -0,0 +1,50 @@
+import networkx as nx
+import numpy as np
+import ThresholdModel as tm
+from SequentialGains import SequentialGains, GainSelect
+
+
+def marginal_gain(model, config, u):
+    model.checkpoint()
+    config.add_model_initial_configuration("Infected", [u])
+    model.set_initial_status(config)
+    _, activated = model.iteration_bunch()
+    model.restore()
+    model.release()
+    return len(activated) + 1
+
+
+def test_gains_match_iteration_bunch_across_rounds():
+    for directed in (False, True):
+        g = nx.erdos_renyi_graph(100, 0.06 if directed else 0.08, seed=5, directed=directed)
+        model, config = tm.InitModel(g, seed=2)
+        config.add_node_array('threshold', np.random.default_rng(1).random(100) * 0.5)
+        config.add_model_initial_configuration("Infected", [])
+        model.set_initial_status(config)
+        gains = SequentialGains(model)
+        activated = model.activated_set()
+        for _ in range(4):
+            gains.update()
+            assert np.array_equal(gains.gains, SequentialGains(model).gains)
+            for u in g.nodes:
+                if u not in activated:
+                    assert gains.gains[model.csr.node_index[u]] == marginal_gain(model, config, u)
+            model.is_reset()
+
+            influencer = GainSelect(activated, gains)
+            config.add_model_initial_configuration("Infected", [influencer])
+            model.set_initial_status(config)
+            _, new = model.iteration_bunch()
+            activated.extend(new)
+            activated.add(influencer)
+            model.random_deactivation(activated)
+            model.is_reset()
+
+
+def test_additions_are_stored_sparsely():
+    g = nx.connected_watts_strogatz_graph(300, 4, 0.1, seed=1)
+    model, config = tm.InitModel(g, seed=2)
+    config.add_model_initial_configuration("Infected", [])
+    model.set_initial_status(config)
+    gains = SequentialGains(model)
+    assert len(gains.members) == gains.gains.sum() < 300 * 300 / 10
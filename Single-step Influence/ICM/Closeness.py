@@ -0,0 +1,134 @@
+import math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from netdispatch import AGraph
+from CSRGraph import CSRGraph, expand_rows
+
+__license__ = "BSD-2-Clause"
+
+# per worker process: the CSR arrays searched
+_worker = {}
+
+
+def _attach(indptr, indices):
+    _worker['indptr'] = indptr
+    _worker['indices'] = indices
+
+
+def _distance_sums(sources, by_source, indptr=None, indices=None):
+    """
+    Breadth-first searches from a set of sources, keeping distances only
+
+    :param sources: array of dense source ids
+    :param by_source: sum the distances per source (True) or per reached node (False)
+    :param indptr: CSR row pointer array (default: the one of the worker)
+    :param indices: CSR neighbour array (default: the one of the worker)
+    :return: (sums, eccentricity) where sums holds one distance sum per source, or per node
+    """
+    if indptr is None:
+        indptr, indices = _worker['indptr'], _worker['indices']
+    n = len(indptr) - 1
+    sums = np.zeros(len(sources) if by_source else n, dtype=np.int64)
+    eccentricity = 0
+
+    # bound the size of the visited matrix
+    chunk = max(1, (1 << 24) // max(n, 1))
+    for start in range(0, len(sources), chunk):
+        batch = np.asarray(sources[start:start + chunk], dtype=np.int64)
+        visited = np.zeros(len(batch) * n, dtype=np.bool_)
+        # position of the last write to every cell, to drop duplicates without sorting
+        stamp = np.zeros(len(batch) * n, dtype=np.int64)
+        labels = np.arange(len(batch), dtype=np.int64)
+        cells = labels * n + batch
+        visited[cells] = True
+        level = 0
+        while len(cells) > 0:
+            level += 1
+            labels, nodes = np.divmod(cells, n)
+            slots, owners = expand_rows(indptr, nodes)
+            cells = labels[owners] * n + indices[slots]
+            cells = cells[~visited[cells]]
+            order = np.arange(len(cells), dtype=np.int64)
+            stamp[cells] = order
+            cells = cells[stamp[cells] == order]
+            if len(cells) == 0:
+                break
+            visited[cells] = True
+            eccentricity = level
+            labels, nodes = np.divmod(cells, n)
+            if by_source:
+                sums[start:start + len(batch)] += level * np.bincount(labels, minlength=len(batch))
+            else:
+                sums += level * np.bincount(nodes, minlength=n)
+    return sums, eccentricity
+
+
+def average_distances(csr, pivots=None, processes=1, rng=None, delta=0.05):
+    """
+    Average shortest distance of every node, as computed by CentralitySort:
+    the sum of the distances to the nodes it reaches, divided by the number
+    of nodes
+
+    The exact mode runs one breadth-first search per node. The approximate
+    mode (Eppstein and Wang, 2004) runs one search per pivot, drawn
+    uniformly: with probability 1 - delta, every estimate is within the
+    returned error of the exact value, D * sqrt(ln(2n / delta) / (2 pivots)),
+    D bounding the distances (twice the largest distance met by the pivots).
+    The bound needs symmetric distances: the approximate mode is only
+    available on undirected graphs.
+
+    :param csr: CSRGraph snapshot of the graph
+    :param pivots: number of pivot sources (None: exact computation)
+    :param processes: number of worker processes the searches are split across
+    :param rng: numpy Generator drawing the pivots
+    :param delta: failure probability of the error bound
+    :return: (distances, error) where distances holds the average distance of every node (dense ids)
+    """
+    n = csr.number_of_nodes()
+    if pivots is not None and pivots < n and csr.directed:
+        raise ValueError("Pivot sampling needs an undirected graph")
+    if pivots is None or pivots >= n:
+        indptr, indices = csr.indptr, csr.indices
+        sources = np.arange(n, dtype=np.int64)
+        by_source = True
+    else:
+        if rng is None:
+            rng = np.random.default_rng()
+        indptr, indices = csr.indptr, csr.indices
+        sources = rng.choice(n, size=pivots, replace=False)
+        by_source = False
+
+    if processes == 1:
+        sums, eccentricity = _distance_sums(sources, by_source, indptr, indices)
+    else:
+        parts = np.array_split(sources, processes * 4)
+        with ProcessPoolExecutor(max_workers=processes, initializer=_attach, initargs=(indptr, indices)) as pool:
+            results = list(pool.map(_distance_sums, parts, [by_source] * len(parts)))
+        if by_source:
+            sums = np.concatenate([r[0] for r in results])
+        else:
+            sums = np.sum([r[0] for r in results], axis=0)
+        eccentricity = max([r[1] for r in results] + [0])
+
+    if by_source:
+        return sums / float(n), 0.0
+    bound = 2 * eccentricity
+    error = bound * math.sqrt(math.log(2 * n / delta) / (2 * len(sources)))
+    return sums / float(len(sources)), error
+
+
+def CentralitySort(g, pivots=None, processes=1):
+    """
+    Sorts graph by average shortest distance (asd) in ascending order
+
+    Same ranking as the notebooks' CentralitySort, from breadth-first
+    searches over a CSR snapshot instead of all-pairs shortest paths.
+
+    :param g: the graph
+    :param pivots: number of pivot sources for the approximate mode, undirected graphs only (None: exact)
+    :param processes: number of worker processes
+    :return: sorted list of nodes
+    """
+    csr = CSRGraph(AGraph(g))
+    distances, _ = average_distances(csr, pivots, processes)
+    return [csr.nodes[i] for i in np.argsort(distances, kind='stable').tolist()]
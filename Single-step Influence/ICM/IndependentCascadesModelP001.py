@@ -1,6 +1,8 @@
 from DiffusionModel import DiffusionModel
+from ModelConfig import Configuration
+from BatchSimulation import CascadeKernel
+from CSRGraph import expand_rows
 import numpy as np
-import future.utils
 
 __author__ = 'Giulio Rossetti'
 __license__ = "BSD-2-Clause"
@@ -51,44 +53,92 @@ class IndependentCascadesModel(DiffusionModel):
         """
         Execute a single model iteration
 
+        Only the frontier (nodes activated by the previous iteration, or the
+        seeds on the first one) attempts to infect its neighbours. The coin
+        flips of the whole frontier are drawn at once from the model
+        generator: a node several frontier nodes attempt activates if any
+        of the attempts succeeds.
+
         :return: Iteration_id, Incremental node status (dictionary node->status)
         """
-        self.clean_initial_status(list(self.available_statuses.values()))
-        actual_status = {node: nstatus for node, nstatus in future.utils.iteritems(self.status)}
+        frontier = self.frontier
+        attempt = self.params['nodes']['attempt']
+        index = self.csr.node_index
+        thresholds = self.edge_array('threshold')
 
-        count_attempts = 0
-        for u in self.graph.nodes: 
-            if self.status[u] != 1: 
+        rows = []
+        for u in frontier:
+            if self.status[u] != 1:
                 continue
-            if self.params['nodes']['attempt'][u] != 0:
+            if attempt[u] != 0:
                 continue
+            attempt[u] = 1
+            rows.append(index[u])
+        count_attempts = len(rows)
+        if self.journal is not None:
+            self.journal.append((self.set_attempts, [self.csr.nodes[i] for i in rows], [0] * count_attempts))
+
+        slots, _ = expand_rows(self.csr.indptr, rows)
+        targets = self.csr.indices[slots]
+        inactive = self.status.array[targets] == 0
+        slots, targets = slots[inactive], targets[inactive]
+        flips = self.rng.random(len(slots))
+        activated = np.unique(targets[flips <= thresholds[slots]])
+        self.status.set_many(activated, 1)
+
+        nodes = self.csr.nodes
+        self.frontier = [nodes[j] for j in activated.tolist()]
+        delta = {v: 1 for v in self.frontier}
 
-            neighbors = list(self.graph.neighbors(u))
-            if len(neighbors) > 0:  
-                for v in neighbors:
-                    if actual_status[v] == 0:
-                        key = (u, v)
-
-                        if 'threshold' in self.params['edges']: 
-                            if key in self.params['edges']['threshold']:
-                                threshold = self.params['edges']['threshold'][key]
-                            elif (v, u) in self.params['edges']['threshold'] and not self.graph.directed: 
-                                threshold = self.params['edges']['threshold'][(v, u)] 
-                        
-                        flip = np.random.random_sample() 
-                        if flip <= threshold:
-                            actual_status[v] = 1
-
-            self.params['nodes']['attempt'][u] = 1
-            count_attempts += 1
-
-        delta, node_count, status_delta = self.status_delta(actual_status)
-        self.status = actual_status
         self.actual_iteration += 1
         if count_attempts == 0:
             self.stop = True
-        
-        active_set_size = node_count.copy()[1]
+
+        active_set_size = self.status.count(1)
         status = delta.copy()
-        
-        return active_set_size, status
\ No newline at end of file
+
+        return active_set_size, status
+
+    def batch_kernel(self):
+        """
+        Batched counterpart of the model iteration
+
+        :return: a CascadeKernel firing each edge with its threshold
+        """
+        return CascadeKernel(self.csr.indptr, self.csr.indices, self.edge_array('threshold'))
+
+    def batch_frontier(self, active, seeds):
+        """
+        Nodes that spread first in a batched realization: the seeds and the
+        pending frontier, as long as they have not attempted yet
+
+        :param active: boolean array of the currently active nodes
+        :param seeds: dense ids of the seed nodes
+        :return: boolean array over the dense node ids
+        """
+        pending = [self.csr.node_index[u] for u in self.frontier if self.status[u] == 1]
+        frontier = np.zeros(len(active), dtype=np.bool_)
+        frontier[seeds + pending] = True
+        return frontier & self.batch_spreaders()
+
+    def batch_spreaders(self):
+        """
+        Nodes allowed to spread once active in a batched realization: those
+        that have not attempted yet (deactivated nodes included)
+
+        :return: boolean array over the dense node ids
+        """
+        attempt = self.params['nodes']['attempt']
+        return np.fromiter((attempt[u] == 0 for u in self.csr.nodes), dtype=np.bool_,
+                           count=self.csr.number_of_nodes())
+
+
+def InitModel(g, seed=None):
+    """
+    Counterpart of the notebooks' InitModel, with the default parameters
+
+    :param g: the graph
+    :param seed: seed of the model generator
+    :return: (model, config)
+    """
+    return IndependentCascadesModel(g, seed), Configuration()
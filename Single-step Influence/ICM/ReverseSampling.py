@@ -0,0 +1,371 @@
+import hashlib
+import math
+import os
+import shutil
+import tempfile
+import numpy as np
+from BatchSimulation import CascadeKernel, ThresholdKernel
+from CSRGraph import expand_rows, transpose
+
+__license__ = "BSD-2-Clause"
+
+
+class RRSets(object):
+    """
+        Flat store of reverse-reachable (RR) sets
+
+        The nodes of RR set i are nodes[offsets[i]:offsets[i + 1]], as dense
+        node ids of the model CSR snapshot.
+    """
+
+    def __init__(self, number_of_nodes):
+        """
+            Store Constructor
+
+            :param number_of_nodes: number of nodes of the sampled graph
+        """
+        self.number_of_nodes = number_of_nodes
+        self.nodes = np.empty(0, dtype=np.int32)
+        self.offsets = np.zeros(1, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def extend(self, nodes, offsets):
+        """
+        Append RR sets
+
+        :param nodes: concatenated nodes of the new sets
+        :param offsets: their offsets, starting at 0
+        """
+        self.nodes = np.concatenate((self.nodes, nodes.astype(np.int32)))
+        self.offsets = np.concatenate((self.offsets, self.offsets[-1] + offsets[1:]))
+
+    def estimate(self, seeds):
+        """
+        Spread estimate of a seed set: n times the fraction of RR sets it hits
+
+        :param seeds: dense ids of the seed nodes
+        :return: estimated spread
+        """
+        if len(self) == 0:
+            return 0.0
+        owners = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.offsets))
+        hit = np.zeros(len(self), dtype=np.bool_)
+        hit[owners[np.isin(self.nodes, seeds)]] = True
+        return self.number_of_nodes * hit.mean()
+
+    def save(self, path):
+        """
+        Write the store to a directory
+
+        Each save goes to a new sets-<count> subdirectory (nodes.npy and
+        offsets.npy) that is renamed into place once complete, so concurrent
+        readers never see a partial store. The previous version is kept for
+        the readers that just picked it, and older ones are removed.
+
+        :param path: directory to write to
+        """
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        tmp = tempfile.mkdtemp(dir=path)
+        np.save(os.path.join(tmp, 'nodes.npy'), self.nodes)
+        np.save(os.path.join(tmp, 'offsets.npy'), self.offsets)
+        target = os.path.join(path, 'sets-%012d' % len(self))
+        try:
+            os.rename(tmp, target)
+        except OSError:
+            # another process saved as many sets already
+            shutil.rmtree(tmp)
+        versions = sorted(name for name in os.listdir(path) if name.startswith('sets-'))
+        for name in versions[:-2]:
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+    @staticmethod
+    def latest(path):
+        """
+        :param path: directory written by save()
+        :return: the subdirectory holding the largest store, or None
+        """
+        if not os.path.isdir(path):
+            return None
+        versions = sorted(name for name in os.listdir(path) if name.startswith('sets-'))
+        return os.path.join(path, versions[-1]) if versions else None
+
+    @classmethod
+    def load(cls, path, number_of_nodes):
+        """
+        Memory-map the largest store written by save()
+
+        If a concurrent save removes the version before it is mapped, the
+        largest one is looked up again.
+
+        :param path: directory written by save()
+        :param number_of_nodes: number of nodes of the sampled graph
+        :return: an RRSets whose arrays are read-only memory maps
+        """
+        sets = cls(number_of_nodes)
+        latest = cls.latest(path)
+        while latest is not None:
+            try:
+                nodes = np.load(os.path.join(latest, 'nodes.npy'), mmap_mode='r')
+                offsets = np.load(os.path.join(latest, 'offsets.npy'), mmap_mode='r')
+            except FileNotFoundError:
+                latest = cls.latest(path)
+                continue
+            sets.nodes, sets.offsets = nodes, offsets
+            break
+        return sets
+
+    def max_coverage(self, k, count=None):
+        """
+        Greedy maximum coverage over the first count RR sets
+
+        :param k: number of seeds
+        :param count: number of RR sets to use (all by default)
+        :return: (seeds, covered) where covered[i] is the number of sets covered by seeds[0:i+1]
+        """
+        if count is None:
+            count = len(self)
+        n = self.number_of_nodes
+        offsets = self.offsets[:count + 1]
+        nodes = self.nodes[:offsets[-1]]
+
+        # inverted index: the sets every node belongs to
+        owners = np.repeat(np.arange(count, dtype=np.int64), np.diff(offsets))
+        by_node = np.argsort(nodes, kind='stable')
+        node_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(nodes, minlength=n), out=node_ptr[1:])
+
+        degree = np.bincount(nodes, minlength=n).astype(np.int64)
+        is_covered = np.zeros(count, dtype=np.bool_)
+        selected = np.zeros(n, dtype=np.bool_)
+        seeds = []
+        covered = []
+        total = 0
+        for _ in range(min(k, n)):
+            # once every set is covered all degrees are 0: never pick a seed twice
+            u = int(np.argmax(np.where(selected, -1, degree)))
+            selected[u] = True
+            seeds.append(u)
+            sets = owners[by_node[node_ptr[u]:node_ptr[u + 1]]]
+            sets = sets[~is_covered[sets]]
+            is_covered[sets] = True
+            total += len(sets)
+            covered.append(total)
+            slots, _ = expand_rows(offsets, sets)
+            degree -= np.bincount(nodes[slots], minlength=n)
+        return seeds, covered
+
+
+class RRSampler(object):
+    """
+        Reverse influence sampler for the edge semantics of a model
+
+        Cascade models (IC, weighted cascade): an RR set holds the nodes that
+        reach a uniformly drawn root through live edges, each edge being live
+        with its activation probability. Linear Threshold: the RR set is a
+        reverse random walk where each node picks at most one predecessor
+        with probability equal to its weight (the live-edge equivalence with
+        the threshold model needs the weights of a node to sum to at most 1;
+        larger sums are rescaled).
+    """
+
+    def __init__(self, model):
+        """
+            Sampler Constructor
+
+            :param model: a configured DiffusionModel providing batch_kernel(), whose generator the sampler draws from
+        """
+        kernel = model.batch_kernel()
+        self.model = model
+        self.rng = model.rng
+        self.number_of_nodes = model.csr.number_of_nodes()
+        if isinstance(kernel, CascadeKernel):
+            self.threshold = False
+            self.indptr, self.indices, slots = transpose(kernel.indptr, kernel.indices)
+            self.probabilities = kernel.probabilities[slots]
+        elif isinstance(kernel, ThresholdKernel):
+            self.threshold = True
+            self.indptr, self.indices, entries = transpose(kernel.out_indptr, kernel.out_targets)
+            weights = kernel.out_weights[entries]
+            # within-row cumulative weights (rescaled when a row sums above 1), offset by twice the
+            # row id so that the whole array stays sorted and one searchsorted picks every walk step
+            rows = np.repeat(np.arange(self.number_of_nodes), np.diff(self.indptr))
+            totals = np.bincount(rows, weights=weights, minlength=self.number_of_nodes)
+            cumulative = np.cumsum(weights)
+            before = np.concatenate(([0.0], cumulative))[self.indptr[:-1]][rows]
+            self.keys = 2.0 * rows + (cumulative - before) / np.maximum(totals[rows], 1.0)
+        else:
+            raise ValueError("Reverse sampling not available for the %s model" % model.name)
+
+    def sample(self, count, roots=None):
+        """
+        Draw RR sets
+
+        :param count: number of RR sets
+        :param roots: optional array of root nodes (dense ids), drawn uniformly otherwise
+        :return: (nodes, offsets) of the new sets
+        """
+        n = self.number_of_nodes
+        if roots is None:
+            roots = self.rng.integers(0, n, size=count)
+        chunk = max(1, (1 << 24) // max(n, 1))
+        parts = []
+        for start in range(0, count, chunk):
+            sets = np.arange(min(chunk, count - start), dtype=np.int64)
+            cells = sets * n + roots[start:start + len(sets)]
+            parts.append(self.__reach(cells, n) + start * n)
+        cells = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+        sets, nodes = np.divmod(cells, n)
+        order = np.argsort(sets, kind='stable')
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sets, minlength=count), out=offsets[1:])
+        return nodes[order], offsets
+
+    def __reach(self, cells, n):
+        """
+        Reverse traversal of a batch of roots
+
+        :param cells: set id * n + root node, one per set
+        :return: set id * n + node for every node of every set
+        """
+        visited = np.zeros((cells.max() // n + 1) * n if len(cells) else 0, dtype=np.bool_)
+        visited[cells] = True
+        reached = [cells]
+        while len(cells) > 0:
+            sets, nodes = np.divmod(cells, n)
+            if self.threshold:
+                draws = 2.0 * nodes + self.rng.random(len(nodes))
+                picked = np.searchsorted(self.keys, draws, side='right')
+                alive = picked < self.indptr[nodes + 1]
+                cells = sets[alive] * n + self.indices[picked[alive]]
+            else:
+                slots, owners = expand_rows(self.indptr, nodes)
+                live = self.rng.random(len(slots)) <= self.probabilities[slots]
+                cells = sets[owners[live]] * n + self.indices[slots[live]]
+            cells = np.unique(cells[~visited[cells]])
+            visited[cells] = True
+            reached.append(cells)
+        return np.concatenate(reached)
+
+
+def fingerprint(model):
+    """
+    Cache key of the samples of a model
+
+    Covers the graph (node labels and adjacency), the model name and the
+    edge parameters its batch kernel reads, e.g. IC with P=0.01 and P=0.10
+    or the threshold model edge weights.
+
+    :param model: a configured DiffusionModel
+    :return: hexadecimal digest
+    """
+    kernel = model.batch_kernel()
+    digest = hashlib.sha1()
+    digest.update(repr(model.csr.nodes).encode())
+    digest.update(model.name.encode())
+    for values in (model.csr.indptr, model.csr.indices) + tuple(
+            getattr(kernel, a) for a in ('indptr', 'indices', 'probabilities',
+                                         'out_indptr', 'out_targets', 'out_weights') if hasattr(kernel, a)):
+        digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+
+class RRSetCache(object):
+    """
+        On-disk RR set stores, one per model fingerprint
+
+        Stores are memory-mapped when read, so several processes can share
+        the samples drawn by earlier runs instead of resampling them.
+    """
+
+    def __init__(self, directory):
+        """
+            Cache Constructor
+
+            :param directory: root directory of the cache
+        """
+        self.directory = directory
+
+    def path(self, model):
+        return os.path.join(self.directory, fingerprint(model))
+
+    def get(self, model):
+        """
+        :param model: a configured DiffusionModel
+        :return: the cached RRSets of the model, or an empty store
+        """
+        return RRSets.load(self.path(model), model.csr.number_of_nodes())
+
+    def put(self, model, sets):
+        """
+        Save the RR sets of a model, unless the cache already holds as many
+
+        :param model: a configured DiffusionModel
+        :param sets: its RRSets
+        """
+        if len(self.get(model)) < len(sets):
+            sets.save(self.path(model))
+
+
+def _log_binomial(n, k):
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+
+def imm(model, k, epsilon=0.5, l=1, sets=None, cache=None):
+    """
+    IMM influence maximization (Tang, Shi and Xiao, 2015)
+
+    RR sets are drawn until the sample-size bound of IMM for k seeds is met,
+    then seeds are picked by greedy maximum coverage. As the greedy order is
+    a prefix order, seeds[0:i] is the selection for every i <= k.
+
+    :param model: a configured DiffusionModel
+    :param k: maximum number of seeds (e.g. tss_range)
+    :param epsilon: approximation error
+    :param l: failure probability is at most 1/n^l
+    :param sets: optional RRSets store to extend (sets already in it are reused)
+    :param cache: optional RRSetCache the samples are read from and saved back to
+    :return: (seeds, spreads) where spreads[i] estimates the spread of seeds[0:i+1]
+    """
+    sampler = RRSampler(model)
+    n = sampler.number_of_nodes
+    if sets is None:
+        sets = cache.get(model) if cache is not None else RRSets(n)
+    k = min(k, n)
+    if n < 2 or k == 0:
+        return [], []
+
+    def fill(theta):
+        if len(sets) < theta:
+            sets.extend(*sampler.sample(int(theta) - len(sets)))
+
+    log_n = math.log(n)
+    l = l * (1 + math.log(2) / log_n)
+    log_binom = _log_binomial(n, k)
+    e_prime = math.sqrt(2) * epsilon
+    lambda_prime = (2 + 2.0 / 3 * e_prime) * (log_binom + l * log_n + math.log(max(math.log2(n), 1))) * n / e_prime ** 2
+    alpha = math.sqrt(l * log_n + math.log(2))
+    beta = math.sqrt((1 - 1 / math.e) * (log_binom + l * log_n + math.log(2)))
+    lambda_star = 2 * n * ((1 - 1 / math.e) * alpha + beta) ** 2 / epsilon ** 2
+
+    # sampling phase: lower bound of the optimal spread
+    lower_bound = 1.0
+    for i in range(1, max(int(math.log2(n)), 2)):
+        x = n / 2.0 ** i
+        theta = math.ceil(lambda_prime / x)
+        fill(theta)
+        _, covered = sets.max_coverage(k, theta)
+        if n * covered[-1] / theta >= (1 + e_prime) * x:
+            lower_bound = n * covered[-1] / theta / (1 + e_prime)
+            break
+
+    theta = math.ceil(lambda_star / lower_bound)
+    fill(theta)
+    if cache is not None:
+        cache.put(model, sets)
+    seeds, covered = sets.max_coverage(k, theta)
+    nodes = model.csr.nodes
+    return [nodes[u] for u in seeds], [n * c / theta for c in covered]
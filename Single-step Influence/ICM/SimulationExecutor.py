@@ -0,0 +1,146 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+__license__ = "BSD-2-Clause"
+
+# per worker process: the batch kernel rebuilt on top of the shared block
+_worker = {}
+
+
+def _attach(name, layout, kernel_class, scalars, n):
+    """
+    Worker initializer: map the shared block and rebuild the kernel on it
+    """
+    block = shared_memory.SharedMemory(name=name)
+    arrays = {}
+    for key, dtype, shape, offset in layout:
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+    arrays.update(scalars)
+    _worker['block'] = block
+    _worker['kernel'] = kernel_class(**arrays)
+    _worker['n'] = n
+
+
+def _run_shard(active, frontier, spreaders, runs, entropy, key):
+    """
+    Run one shard of realizations in a worker
+
+    :param active: dense ids of the initially active nodes
+    :param frontier: dense ids of the nodes that spread first
+    :param spreaders: boolean array of the nodes allowed to spread, None if all of them are
+    :param runs: number of realizations in the shard
+    :param entropy: entropy of the executor seed sequence
+    :param key: spawn key of the shard stream
+    :return: array with the final active set size of every realization
+    """
+    n = _worker['n']
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=key))
+    state = np.zeros((runs, n), dtype=np.bool_)
+    state[:, active] = True
+    start = np.zeros((runs, n), dtype=np.bool_)
+    start[:, frontier] = True
+    return _worker['kernel'].run(state, start, rng, spreaders).sum(axis=1).astype(np.int64)
+
+
+class SimulationExecutor(object):
+    """
+        Process pool running the batched simulations of a model
+
+        The arrays of the model batch kernel are copied once into a shared
+        memory block that every worker maps, so tasks only carry the initial
+        state of their realizations. Runs are split into shards of fixed
+        size, each with its own random stream spawned from the executor seed
+        sequence: the results depend on the seed only, not on the number of
+        processes or on the order the shards complete in.
+    """
+
+    def __init__(self, model, processes=None, seed=None, shard=64, kernel=None):
+        """
+            Executor Constructor
+
+            :param model: a configured DiffusionModel, its status is read at every call
+            :param processes: number of worker processes (default: number of cores)
+            :param seed: seed of the random streams (default: fresh entropy)
+            :param shard: number of realizations per task
+            :param kernel: batch kernel to use (default: the one returned by model.batch_kernel())
+        """
+        if kernel is None:
+            kernel = model.batch_kernel()
+        self.model = model
+        self.shard = shard
+        self.entropy = np.random.SeedSequence(seed).entropy
+        self.calls = 0
+
+        layout = []
+        scalars = {}
+        size = 0
+        for key, value in vars(kernel).items():
+            if isinstance(value, np.ndarray):
+                layout.append((key, value.dtype.str, value.shape, size))
+                size += (value.nbytes + 63) // 64 * 64
+            else:
+                scalars[key] = value
+
+        self.block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for key, dtype, shape, offset in layout:
+            np.ndarray(shape, dtype=dtype, buffer=self.block.buf, offset=offset)[...] = getattr(kernel, key)
+
+        self.pool = ProcessPoolExecutor(
+            max_workers=processes, initializer=_attach,
+            initargs=(self.block.name, layout, type(kernel), scalars, model.csr.number_of_nodes()))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Shut the workers down and release the shared block
+        """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+            self.block.close()
+            self.block.unlink()
+
+    def __submit(self, seeds, runs, key):
+        active, frontier = self.model.batch_state(seeds)
+        active, frontier = np.flatnonzero(active), np.flatnonzero(frontier)
+        spreaders = self.model.batch_spreaders()
+        return [self.pool.submit(_run_shard, active, frontier, spreaders, min(self.shard, runs - start),
+                                 self.entropy, key + (s,))
+                for s, start in enumerate(range(0, runs, self.shard))]
+
+    def spread(self, seeds, runs=100):
+        """
+        Parallel counterpart of DiffusionModel.simulate_batch
+
+        :param seeds: list of nodes to activate
+        :param runs: number of realizations
+        :return: array with the final active set size of every realization
+        """
+        self.calls += 1
+        futures = self.__submit(seeds, runs, (self.calls,))
+        return np.concatenate([f.result() for f in futures])
+
+    def spreads(self, candidates, runs=100, seeds=()):
+        """
+        Spread of every candidate added to a seed set, candidates and runs
+        being sharded across the workers
+
+        :param candidates: list of candidate nodes
+        :param runs: number of realizations per candidate
+        :param seeds: nodes activated along with every candidate
+        :return: (candidates x runs) array of final active set sizes
+        """
+        self.calls += 1
+        seeds = list(seeds)
+        futures = [self.__submit(seeds + [c], runs, (self.calls, i)) for i, c in enumerate(candidates)]
+        spread = np.empty((len(candidates), runs), dtype=np.int64)
+        for i, shards in enumerate(futures):
+            if shards:
+                spread[i] = np.concatenate([f.result() for f in shards])
+        return spread
@@ -0,0 +1,42 @@
+import networkx as nx
+import numpy as np
+import IndependentCascadesModelP010 as p010
+from LiveEdgeSampling import LiveEdgeSamples
+from test_cascade_model import certain, run
+
+
+def test_attempted_nodes_are_reached_but_not_expanded():
+    g = nx.DiGraph([(0, 1), (1, 2), (1, 3), (2, 1), (3, 1)])
+    model, config = certain(p010, g)
+    run(model, config, [1])
+    for u in (1, 2):
+        model.status[u] = 0
+    samples = LiveEdgeSamples(model, runs=10)
+    assert np.all(samples.spread([0]) == 3)
+    assert run(model, config, [0])[0] == 3
+
+
+def test_spread_matches_iteration_bunch_after_deactivations():
+    g = nx.erdos_renyi_graph(80, 0.04, seed=3, directed=True)
+    model, config = certain(p010, g)
+    run(model, config, [0])
+    run(model, config, [5])
+    for u in [u for u in g.nodes if model.status[u] == 1][::2]:
+        model.status[u] = 0
+    samples = LiveEdgeSamples(model, runs=5)
+    model.checkpoint()
+    for seeds in ([7], [9, 11], [0]):
+        spread = samples.spread(seeds)
+        assert np.all(spread == run(model, config, seeds)[0])
+        model.restore()
+
+
+def test_spread_mean_matches_simulations():
+    g = nx.erdos_renyi_graph(60, 0.1, seed=4)
+    model, config = p010.InitModel(g, seed=1)
+    config.add_model_initial_configuration("Infected", [])
+    model.set_initial_status(config)
+    spread = LiveEdgeSamples(model, runs=2000).spread([0, 1])
+    simulated = model.simulate_batch([0, 1], runs=2000)
+    error = 4 * np.sqrt((np.var(spread) + np.var(simulated)) / 2000)
+    assert abs(np.mean(spread) - np.mean(simulated)) <= error
@@ -0,0 +1,104 @@
+import networkx as nx
+import numpy as np
+import pytest
+import IndependentCascadesModelP010 as p010
+from DiffusionModel import ConfigurationException
+from ModelConfig import Configuration
+from test_cascade_model import run
+
+
+def graph():
+    return nx.erdos_renyi_graph(60, 0.08, seed=3, directed=True)
+
+
+def runs(config, g, seeds=([0], [5, 6], [10, 20, 30])):
+    model, _ = p010.InitModel(g, seed=7)
+    return [run(model, config, list(s)) for s in seeds]
+
+
+def test_arrays_match_dictionaries():
+    g = graph()
+    thresholds = np.random.default_rng(0).random(g.number_of_edges())
+    _, by_array = p010.InitModel(g)
+    by_array.add_edge_array('threshold', thresholds)
+    _, by_dict = p010.InitModel(g)
+    by_dict.add_edge_set_configuration('threshold', dict(zip(g.edges, thresholds.tolist())))
+    assert runs(by_array, g) == runs(by_dict, g)
+
+
+def test_misaligned_arrays_are_rejected():
+    g = graph()
+    for values in (np.ones(g.number_of_edges() - 1), np.ones(g.number_of_edges() + 1)):
+        model, config = p010.InitModel(g)
+        config.add_edge_array('threshold', values)
+        config.add_model_initial_configuration("Infected", [0])
+        with pytest.raises(ConfigurationException):
+            model.set_initial_status(config)
+    for values in (np.ones(len(g) - 1), np.ones(len(g) + 1)):
+        model, config = p010.InitModel(g)
+        config.add_node_array('weight', values)
+        config.add_model_initial_configuration("Infected", [0])
+        with pytest.raises(ConfigurationException):
+            model.set_initial_status(config)
+
+
+def test_mixed_array_and_item_updates():
+    g = graph()
+    edges = list(g.edges)
+    thresholds = np.random.default_rng(0).random(len(edges))
+    _, config = p010.InitModel(g)
+    config.add_edge_array('threshold', thresholds)
+    with pytest.raises(ConfigurationException):
+        config.add_edge_configuration('threshold', edges[5], 1.0)
+    config.add_node_array('weight', np.ones(len(g)))
+    with pytest.raises(ConfigurationException):
+        config.add_node_configuration('weight', 5, 0.0)
+
+    # a whole dictionary replaces the array, and items can be updated again
+    thresholds[5] = 1.0
+    config.add_edge_set_configuration('threshold', dict(zip(edges, thresholds.tolist())))
+    config.add_edge_configuration('threshold', edges[6], 1.0)
+    thresholds[6] = 1.0
+    _, reference = p010.InitModel(g)
+    reference.add_edge_array('threshold', thresholds)
+    assert runs(config, g) == runs(reference, g)
+
+    # and an array replaces a dictionary
+    config.add_edge_array('threshold', np.ones(len(edges)))
+    reference.add_edge_set_configuration('threshold', {e: 1.0 for e in edges})
+    assert runs(config, g) == runs(reference, g)
+
+
+def test_configuration_is_only_reloaded_when_modified():
+    g = graph()
+    edges = list(g.edges)
+    model, config = p010.InitModel(g)
+    config.add_edge_set_configuration('threshold', {e: 0.5 for e in edges})
+    config.add_edge_array('delay', np.ones(len(edges)))
+    config.add_node_set_configuration('weight', {u: 1.0 for u in g.nodes})
+
+    def arrays():
+        return model.edge_array('threshold'), model.edge_array('delay'), model.node_array('weight')
+
+    run(model, config, [0])
+    threshold, delay, weight = arrays()
+    run(model, config, [1])
+    assert all(a is b for a, b in zip(arrays(), (threshold, delay, weight)))
+
+    config.add_edge_configuration('threshold', edges[0], 1.0)
+    run(model, config, [2])
+    current = arrays()
+    assert current[0] is not threshold and current[0].max() == 1.0
+    assert current[1] is delay and current[2] is weight
+    threshold = current[0]
+
+    config.add_node_configuration('weight', 3, 2.0)
+    run(model, config, [2])
+    current = arrays()
+    assert current[2] is not weight and current[2].max() == 2.0
+    assert current[0] is threshold and current[1] is delay
+
+    other = Configuration()
+    other.config = config.config
+    run(model, other, [0])
+    assert not any(a is b for a, b in zip(arrays(), current))
@@ -0,0 +1,29 @@
+import networkx as nx
+import numpy as np
+import IndependentCascadesModelP010 as p010
+from SimulationExecutor import SimulationExecutor
+from test_cascade_model import certain, run
+
+
+def test_executor_matches_iteration_bunch():
+    g = nx.erdos_renyi_graph(80, 0.04, seed=3, directed=True)
+    model, config = certain(p010, g)
+    run(model, config, [0])
+    for u in [u for u in g.nodes if model.status[u] == 1][::2]:
+        model.status[u] = 0
+    model.checkpoint()
+    with SimulationExecutor(model, processes=2, seed=1, shard=8) as executor:
+        spread = executor.spread([7, 9], runs=20)
+    assert np.all(spread == run(model, config, [7, 9])[0])
+
+
+def test_executor_does_not_depend_on_the_number_of_processes():
+    g = nx.erdos_renyi_graph(60, 0.1, seed=4)
+    model, config = p010.InitModel(g, seed=1)
+    config.add_model_initial_configuration("Infected", [])
+    model.set_initial_status(config)
+    results = []
+    for processes in (1, 3):
+        with SimulationExecutor(model, processes=processes, seed=5, shard=16) as executor:
+            results.append(executor.spread([0, 1], runs=100))
+    assert np.array_equal(results[0], results[1])
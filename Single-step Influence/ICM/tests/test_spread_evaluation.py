@@ -0,0 +1,46 @@
+import networkx as nx
+import numpy as np
+import IndependentCascadesModelP010 as p010
+from SpreadEvaluation import SpreadCurve, evaluate_ranking
+from test_cascade_model import certain, run
+
+
+def test_batches_merge_into_the_one_shot_statistics():
+    sizes = np.random.default_rng(0).poisson(20, size=(257, 6)).astype(np.float64)
+    curve = SpreadCurve(6)
+    start = 0
+    for runs in (1, 0, 2, 50, 3, 100, 101):
+        curve.add(sizes[start:start + runs])
+        start += runs
+    assert curve.runs == 257
+    assert np.allclose(curve.mean, sizes.mean(axis=0))
+    assert np.allclose(curve.variance(), sizes.var(axis=0, ddof=1))
+    assert np.allclose(curve.half_width(0.95), 1.959964 * sizes.std(axis=0, ddof=1) / np.sqrt(257))
+    lower, upper = curve.interval(0.99)
+    assert np.allclose(upper - lower, 2 * 2.575829 * sizes.std(axis=0, ddof=1) / np.sqrt(257))
+
+
+def test_no_interval_below_two_runs():
+    curve = SpreadCurve(3)
+    assert np.all(np.isinf(curve.half_width()))
+    curve.add(np.array([[1.0, 2.0, 3.0]]))
+    assert np.all(np.isinf(curve.variance()))
+    assert np.all(np.isinf(curve.half_width()))
+    curve.add(np.array([[1.0, 2.0, 3.0]]))
+    assert np.all(curve.half_width() == 0)
+
+
+def test_early_stop():
+    g = nx.erdos_renyi_graph(60, 0.08, seed=3, directed=True)
+    model, config = certain(p010, g)
+    run(model, config, [])
+    curve = evaluate_ranking(model, list(range(10)), 5, tolerance=0.5, batch=1, max_runs=50)
+    assert curve.runs == 2
+    assert np.all(curve.half_width() == 0)
+
+    model, config = p010.InitModel(g, seed=1)
+    run(model, config, [])
+    curve = evaluate_ranking(model, list(range(10)), 5, tolerance=0.5, batch=25, max_runs=2000)
+    assert curve.runs % 25 == 0 and curve.runs < 2000
+    assert curve.half_width().max() <= 0.5
+    assert evaluate_ranking(model, list(range(10)), 5, tolerance=None, batch=25, max_runs=100).runs == 100
@@ -5,6 +5,9 @@ import past.builtins
 import future.utils
 import six
 from netdispatch import AGraph
+from CSRGraph import CSRGraph
+from EventLog import NullSink, EventLog
+from NodeStatus import NodeStatus
 import tqdm
 
 __author__ = "Giulio Rossetti"
@@ -28,9 +31,11 @@ class DiffusionModel(object):
             Model Constructor
 
             :param graph: A networkx graph object
+            :param seed: seed of the model random generator
         """
 
-        np.random.seed(seed)
+        # every random draw of the model comes from its own generator, never from the global numpy state
+        self.rng = np.random.default_rng(seed)
 
         self.discrete_state = True
 
@@ -58,11 +63,23 @@ class DiffusionModel(object):
 
         self.actual_iteration = 0
         self.graph = AGraph(graph)
-        self.status = {n: 0 for n in self.graph.nodes}
+        self.csr = CSRGraph(self.graph)
+        self.node_arrays = {}
+        self.edge_arrays = {}
+        self.status = NodeStatus(self.csr.nodes, self.csr.node_index)
         self.attempt = {n: 0 for n in self.graph.nodes}
-        self.initial_status = {}
+        self.initial_status = NodeStatus(self.csr.nodes, self.csr.node_index)
+        self.configuration_stamp = None
+        self.frontier = []
         self.stop = False
 
+        # where events are reported, see EventLog
+        self.events = NullSink()
+
+        # undo log of the changes made since checkpoint(): (write, ids, old values) entries
+        self.journal = None
+        self.__checkpoint = None
+
     def __validate_configuration(self, configuration):
         """
         Validate the consistency of a Configuration object for the specific model
@@ -129,40 +146,91 @@ class DiffusionModel(object):
                         # print(eid)
                         # print(self.parameters['edges'][param]['default'])
                         # print('edge done')
-                        
-
-        # Checking initial simulation status
-        sts = set(configuration.get_model_configuration().keys())
-        if self.discrete_state and "Infected" not in sts and "fraction_infected" not in mdp \
-                and "percentage_infected" not in mdp:
-            warnings.warn('Initial infection missing: a random sample of 5% of graph nodes will be set as infected')
-            self.params['model']["fraction_infected"] = 0.05
 
-    def set_initial_status(self, configuration):
+    def __load_configuration(self, configuration):
         """
-        Set the initial model configuration
+        Validate and load the node, edge and model parameters of a Configuration object
 
-        :param configuration: a ```ndlib.models.ModelConfig.Configuration``` object
-        """
+        The loaded configuration is stamped with its version. On the same
+        configuration, only the parameters modified since then are loaded
+        again, and the parameter arrays built from the others are kept.
 
-        self.__validate_configuration(configuration)
+        :param configuration: a Configuration object instance
+        """
+        stamp = self.configuration_stamp
+        since = stamp[1] if stamp is not None and stamp[0] is configuration else None
+        if since is None:
+            self.__validate_configuration(configuration)
+            self.node_arrays = {}
+            self.edge_arrays = {}
 
         nodes_cfg = configuration.get_nodes_configuration()
         # Set additional node information
 
         for param, node_to_value in future.utils.iteritems(nodes_cfg):
+            if since is not None and configuration.modified.get(('nodes', param), 0) <= since:
+                continue
             if len(node_to_value) < len(self.graph.nodes):
                 raise ConfigurationException({"message": "Not all nodes have a configuration specified"})
+            if isinstance(node_to_value, np.ndarray) and len(node_to_value) != len(self.graph.nodes):
+                raise ConfigurationException({"message": "Node array not aligned with the graph nodes",
+                                              "parameters": {param}})
 
             self.params['nodes'][param] = node_to_value
+            self.node_arrays.pop(param, None)
 
         edges_cfg = configuration.get_edges_configuration()
         # Set additional edges information
         for param, edge_to_values in future.utils.iteritems(edges_cfg):
-            if len(edge_to_values) == len(self.graph.edges):
+            if since is not None and configuration.modified.get(('edges', param), 0) <= since:
+                continue
+            if isinstance(edge_to_values, np.ndarray):
+                if len(edge_to_values) != len(self.graph.edges):
+                    raise ConfigurationException({"message": "Edge array not aligned with the graph edges",
+                                                  "parameters": {param}})
+                self.params['edges'][param] = edge_to_values
+                self.edge_arrays.pop(param, None)
+            elif len(edge_to_values) == len(self.graph.edges):
                 self.params['edges'][param] = {}
                 for e in edge_to_values:
                     self.params['edges'][param][e] = edge_to_values[e]
+                self.edge_arrays.pop(param, None)
+
+        # Set model additional information
+        model_params = configuration.get_model_parameters()
+        for param, val in future.utils.iteritems(model_params):
+            self.params['model'][param] = val
+
+        self.configuration_stamp = (configuration, configuration.version)
+
+    def __validate_initial_status(self, configuration):
+        """
+        Check the initial status of a Configuration object
+
+        :param configuration: a Configuration object instance
+        """
+        mdp = configuration.get_model_parameters()
+        sts = set(configuration.get_model_configuration().keys())
+        if self.discrete_state and "Infected" not in sts and "fraction_infected" not in mdp \
+                and "percentage_infected" not in mdp:
+            warnings.warn('Initial infection missing: a random sample of 5% of graph nodes will be set as infected')
+            self.params['model']["fraction_infected"] = 0.05
+
+    def set_initial_status(self, configuration):
+        """
+        Set the initial model configuration
+
+        Parameters are only loaded again when the configuration changed since
+        the previous call, so that setting a new seed set on the same
+        configuration costs O(|seeds|).
+
+        :param configuration: a ```ndlib.models.ModelConfig.Configuration``` object
+        """
+
+        stamp = self.configuration_stamp
+        if stamp is None or stamp[0] is not configuration or stamp[1] != configuration.version:
+            self.__load_configuration(configuration)
+        self.__validate_initial_status(configuration)
 
         # Set initial status
         model_status = configuration.get_model_configuration()
@@ -171,11 +239,8 @@ class DiffusionModel(object):
             self.params['status'][param] = nodes
             for node in nodes:
                 self.status[node] = self.available_statuses[param]
-
-        # Set model additional information
-        model_params = configuration.get_model_parameters()
-        for param, val in future.utils.iteritems(model_params):
-            self.params['model'][param] = val
+            if param == 'Infected':
+                self.frontier.extend(nodes)
 
         # Handle initial infection
         if 'Infected' not in self.params['status']:
@@ -190,20 +255,51 @@ class DiffusionModel(object):
                     number_of_initial_infected = 1
 
                 available_nodes = [n for n in self.status if self.status[n] == 0]
-                sampled_nodes = np.random.choice(available_nodes, int(number_of_initial_infected), replace=False)
+                sampled_nodes = self.rng.choice(available_nodes, int(number_of_initial_infected), replace=False)
                 for k in sampled_nodes:
                     self.status[k] = self.available_statuses['Infected']
+                self.frontier.extend(sampled_nodes)
+
+        self.initial_status.assign(self.status)
 
-        self.initial_status = self.status
+    def node_array(self, param):
+        """
+        Node parameter laid out along the dense node ids of the CSR snapshot
+
+        The array is built on first use after the parameter is loaded. A
+        parameter configured as an array is returned as a view of it, a new
+        one at every load so that the models can tell reloads by identity.
+
+        :param param: node parameter name
+        :return: float array with one value per node
+        """
+        if param not in self.node_arrays:
+            node_to_value = self.params['nodes'][param]
+            if isinstance(node_to_value, np.ndarray):
+                self.node_arrays[param] = node_to_value.view()
+            else:
+                self.node_arrays[param] = np.array([node_to_value[n] for n in self.csr.nodes], dtype=np.float64)
+        return self.node_arrays[param]
+
+    def edge_array(self, param):
+        """
+        Edge parameter laid out along the slots of the CSR snapshot
+
+        The array is built on first use after the parameter is loaded.
+
+        :param param: edge parameter name
+        :return: float array with one value per slot
+        """
+        if param not in self.edge_arrays:
+            self.edge_arrays[param] = self.csr.edge_values(self.params['edges'][param])
+        return self.edge_arrays[param]
 
     def clean_initial_status(self, valid_status=None):
         """
         Check the consistency of initial status
         :param valid_status: valid node configurations
         """
-        for n, s in future.utils.iteritems(self.status):
-            if s not in valid_status:
-                self.status[n] = 0
+        self.status.clean(valid_status)
 
     # def iteration_bunch(self, bunch_size, node_status=True):
     def iteration_bunch(self, node_status=True):
@@ -239,6 +335,113 @@ class DiffusionModel(object):
         # print(self.status)
         return active_set_size, all_activated_nodes
             
+    def simulate_batch(self, seeds, runs=100, kernel=None, rng=None):
+        """
+        Execute many independent realizations of a diffusion at once
+
+        Realizations start from the current model status with the seeds
+        activated on top of it, and leave the model status untouched. The
+        state of all of them is held in a (runs x nodes) boolean matrix.
+
+        :param seeds: list of nodes to activate
+        :param runs: number of realizations
+        :param kernel: batch kernel to use (default: the one returned by batch_kernel())
+        :param rng: numpy Generator to draw from (default: the model one)
+        :return: array with the final active set size of every realization
+        """
+        if kernel is None:
+            kernel = self.batch_kernel()
+        if rng is None:
+            rng = self.rng
+
+        n = self.csr.number_of_nodes()
+        active, frontier = self.batch_state(seeds)
+        spreaders = self.batch_spreaders()
+
+        # bound the size of the state matrices
+        chunk = max(1, (1 << 24) // max(n, 1))
+        spread = np.empty(runs, dtype=np.int64)
+        for start in range(0, runs, chunk):
+            size = min(chunk, runs - start)
+            state = kernel.run(np.tile(active, (size, 1)), np.tile(frontier, (size, 1)), rng, spreaders)
+            spread[start:start + size] = state.sum(axis=1)
+        return spread
+
+    def simulate_prefixes(self, seeds, runs=100, kernel=None, rng=None):
+        """
+        Spread of every prefix of a seed sequence, from one batch of realizations
+
+        Every realization activates the seeds one at a time, resuming the
+        diffusion from where the previous prefix stopped: the prefixes share
+        their random draws, and the whole curve costs about as much as a
+        single simulation of the longest one.
+
+        :param seeds: ordered list of nodes to activate
+        :param runs: number of realizations
+        :param kernel: batch kernel to use (default: the one returned by batch_kernel())
+        :param rng: numpy Generator to draw from (default: the model one)
+        :return: (runs x len(seeds)+1) array, column i holding the final active set size with seeds[0:i]
+        """
+        if kernel is None:
+            kernel = self.batch_kernel()
+        if rng is None:
+            rng = self.rng
+
+        n = self.csr.number_of_nodes()
+        active, frontier = self.batch_state([])
+        spreaders = self.batch_spreaders()
+        order = [self.csr.node_index[s] for s in seeds]
+
+        # bound the size of the state matrices
+        chunk = max(1, (1 << 24) // max(n, 1))
+        sizes = np.empty((runs, len(order) + 1), dtype=np.int64)
+        for start in range(0, runs, chunk):
+            size = min(chunk, runs - start)
+            sizes[start:start + size] = kernel.curve(np.tile(active, (size, 1)), np.tile(frontier, (size, 1)),
+                                                     order, rng, spreaders)
+        return sizes
+
+    def batch_state(self, seeds):
+        """
+        Initial state of a batched realization
+
+        :param seeds: list of nodes to activate on top of the current status
+        :return: (active, frontier) boolean arrays over the dense node ids
+        """
+        seeds = [self.csr.node_index[s] for s in seeds]
+        active = self.status.array == 1
+        frontier = self.batch_frontier(active, seeds)
+        active[seeds] = True
+        return active, frontier
+
+    def batch_kernel(self):
+        """
+        Batched counterpart of the model iteration, see BatchSimulation
+
+        :return: a kernel object exposing run(active, frontier, rng)
+        """
+        raise NotImplementedError("Batched simulation not available for the %s model" % self.name)
+
+    def batch_frontier(self, active, seeds):
+        """
+        Nodes that spread first in a batched realization
+
+        :param active: boolean array of the currently active nodes
+        :param seeds: dense ids of the seed nodes
+        :return: boolean array over the dense node ids
+        """
+        frontier = active.copy()
+        frontier[seeds] = True
+        return frontier
+
+    def batch_spreaders(self):
+        """
+        Nodes allowed to spread once active in a batched realization
+
+        :return: boolean array over the dense node ids, None if every node is
+        """
+        return None
+
     def mg_reset(self, temp_activated_nodes):
         # mg reset for mg testing
         #reset nodes that were activated during marginal gain testing
@@ -256,6 +459,69 @@ class DiffusionModel(object):
         # reset self.stop so can proceed with subsequent mg testing and is 
         self.stop = False
 
+    def log_events(self, path):
+        """
+        Write the events of the model to a binary log instead of dropping them
+
+        :param path: file to write, see EventLog.read_events
+        :return: the EventLog, also available as self.events
+        """
+        self.events.close()
+        self.events = EventLog(path, self.csr.node_index)
+        return self.events
+
+    def checkpoint(self):
+        """
+        Start recording the changes made to the model state
+
+        From now on, the node statuses, the attempt flags and the model
+        specific state log the values they overwrite, so that restore() can
+        bring the model back to this point in O(changed nodes) instead of
+        rebuilding or scanning it.
+        """
+        self.journal = []
+        self.status.journal = self.journal
+        self.initial_status.journal = self.journal
+        self.__checkpoint = (self.status, self.initial_status, list(self.frontier), self.stop,
+                             self.actual_iteration, dict(self.params['status']))
+
+    def restore(self):
+        """
+        Undo every change made since the last checkpoint(), which stays active
+        """
+        if self.journal is None:
+            raise ValueError("No checkpoint to restore")
+        for write, ids, old in reversed(self.journal):
+            write(ids, old)
+        del self.journal[:]
+        status, initial_status, frontier, stop, actual_iteration, params_status = self.__checkpoint
+        self.status = status
+        self.initial_status = initial_status
+        self.frontier = list(frontier)
+        self.stop = stop
+        self.actual_iteration = actual_iteration
+        self.params['status'] = dict(params_status)
+
+    def release(self):
+        """
+        Stop recording changes, keeping the current state
+        """
+        self.status.journal = None
+        self.initial_status.journal = None
+        self.journal = None
+        self.__checkpoint = None
+
+    def set_attempts(self, nodes, attempts):
+        """
+        Write back the attempt flags of some nodes, without journaling
+
+        :param nodes: list of nodes
+        :param attempts: their attempt flags
+        """
+        attempt = self.params['nodes']['attempt']
+        for u, a in zip(nodes, attempts):
+            attempt[u] = a
+
     def get_info(self):
         """
         Describes the current model parameters (nodes, edges, status)
@@ -274,29 +540,30 @@ class DiffusionModel(object):
         self.actual_iteration = 0
 
         if infected_nodes is not None:
-            for n in self.status:
-                self.status[n] = 0
+            self.status.fill(0)
             for n in infected_nodes:
                 self.status[n] = self.available_statuses['Infected']
-            self.initial_status = self.status
+            self.frontier = list(infected_nodes)
+            self.initial_status.assign(self.status)
             self.stop = False
 
         else:
             if 'percentage_infected' in self.params['model']:
                 self.params['model']['fraction_infected'] = self.params['model']['percentage_infected']
             if 'fraction_infected' in self.params['model']:
-                for n in self.status:
-                    self.status[n] = 0
+                self.status.fill(0)
+                self.frontier = []
                 number_of_initial_infected = self.graph.number_of_nodes() * float(self.params['model']['fraction_infected'])
                 available_nodes = [n for n in self.status if self.status[n] == 0]
-                sampled_nodes = np.random.choice(available_nodes, int(number_of_initial_infected), replace=False)
+                sampled_nodes = self.rng.choice(available_nodes, int(number_of_initial_infected), replace=False)
 
                 for k in sampled_nodes:
                     self.status[k] = self.available_statuses['Infected']
+                self.frontier.extend(sampled_nodes)
 
-                self.initial_status = self.status
+                self.initial_status.assign(self.status)
             else:
-                self.status = self.initial_status
+                self.status.assign(self.initial_status)
 
         return self
 
@@ -353,6 +620,14 @@ class DiffusionModel(object):
                  count of actual nodes per status (dictionary status->node count),
                  delta of nodes per status w.r.t the previous configuration (dictionary status->delta)
         """
+        if isinstance(actual_status, NodeStatus):
+            nodes = self.csr.nodes
+            changed = np.flatnonzero(self.status.array != actual_status.array)
+            delta = {nodes[i]: int(actual_status.array[i]) for i in changed.tolist()}
+            actual_status_count = {st: actual_status.count(st) for st in self.available_statuses.values()}
+            status_delta = {st: actual_status_count[st] - self.status.count(st) for st in actual_status_count}
+            return delta, actual_status_count, status_delta
+
         actual_status_count = {}
         old_status_count = {}
         delta = {}
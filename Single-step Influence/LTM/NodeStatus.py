@@ -0,0 +1,217 @@
+import numpy as np
+try:
+    from collections.abc import MutableMapping, MutableSet
+except ImportError:
+    from collections import MutableMapping, MutableSet
+
+__license__ = "BSD-2-Clause"
+
+# statuses are stored as int8, counts are indexed by status + _OFFSET
+_OFFSET = 128
+
+
+class NodeStatus(MutableMapping):
+    """
+        Node statuses held in a preallocated int8 array over dense node ids
+
+        Behaves as the node->status dictionary the models used to keep, while
+        maintaining the number of nodes in every status as they change, so
+        that counting a status never scans the nodes.
+
+        While a journal list is attached, every change appends the entry
+        (self.write, ids, old statuses) to it, so that replaying the entries
+        in reverse order undoes the changes (see DiffusionModel.checkpoint).
+    """
+
+    def __init__(self, nodes, node_index):
+        """
+            Status Constructor
+
+            :param nodes: list of nodes, in dense id order
+            :param node_index: dictionary mapping each node to its dense id
+        """
+        self.nodes = nodes
+        self.node_index = node_index
+        self.array = np.zeros(len(nodes), dtype=np.int8)
+        self.counts = np.zeros(256, dtype=np.int64)
+        self.counts[_OFFSET] = len(nodes)
+        self.journal = None
+
+    def __getitem__(self, node):
+        return int(self.array[self.node_index[node]])
+
+    def __setitem__(self, node, status):
+        i = self.node_index[node]
+        old = int(self.array[i])
+        if old != status:
+            if self.journal is not None:
+                self.journal.append((self.write, np.array([i]), np.array([old], dtype=np.int8)))
+            self.counts[old + _OFFSET] -= 1
+            self.counts[status + _OFFSET] += 1
+            self.array[i] = status
+
+    def __delitem__(self, node):
+        raise TypeError("Node statuses cannot be removed")
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def count(self, status):
+        """
+        :param status: status code
+        :return: number of nodes in that status
+        """
+        return int(self.counts[status + _OFFSET])
+
+    def set_many(self, ids, status):
+        """
+        Set the status of several nodes at once
+
+        :param ids: array of distinct dense node ids
+        :param status: status code
+        """
+        ids = ids[self.array[ids] != status]
+        if self.journal is not None:
+            self.journal.append((self.write, ids, self.array[ids]))
+        np.subtract.at(self.counts, self.array[ids].astype(np.int64) + _OFFSET, 1)
+        self.counts[status + _OFFSET] += len(ids)
+        self.array[ids] = status
+
+    def write(self, ids, statuses):
+        """
+        Set the status of several nodes, each to its own value, without journaling
+
+        :param ids: array of distinct dense node ids
+        :param statuses: array of status codes, one per id
+        """
+        np.subtract.at(self.counts, self.array[ids].astype(np.int64) + _OFFSET, 1)
+        np.add.at(self.counts, np.asarray(statuses, dtype=np.int64) + _OFFSET, 1)
+        self.array[ids] = statuses
+
+    def fill(self, status):
+        """
+        Set every node to the same status
+
+        :param status: status code
+        """
+        if self.journal is not None:
+            self.journal.append((self.write, np.arange(len(self.array)), self.array.copy()))
+        self.array.fill(status)
+        self.counts.fill(0)
+        self.counts[status + _OFFSET] = len(self.array)
+
+    def clean(self, valid_status):
+        """
+        Reset to 0 the nodes whose status is not among the valid ones
+
+        :param valid_status: list of valid status codes
+        """
+        valid = np.asarray(valid_status, dtype=np.int64) + _OFFSET
+        if self.counts.sum() != self.counts[valid].sum():
+            self.set_many(np.flatnonzero(~np.isin(self.array, valid_status)), 0)
+
+    def assign(self, other):
+        """
+        Overwrite the statuses with those of another NodeStatus over the same nodes, without allocating
+
+        :param other: a NodeStatus object
+        """
+        if self.journal is not None:
+            ids = np.flatnonzero(self.array != other.array)
+            self.journal.append((self.write, ids, self.array[ids]))
+        np.copyto(self.array, other.array)
+        np.copyto(self.counts, other.counts)
+
+    def copy(self):
+        """
+        :return: a NodeStatus object holding the same statuses
+        """
+        status = NodeStatus(self.nodes, self.node_index)
+        status.assign(self)
+        return status
+
+
+class NodeSet(MutableSet):
+    """
+        Set of nodes held as a boolean mask over dense node ids
+
+        Membership tests, insertions and removals cost O(1), and batches of
+        dense ids are added or removed at once. Iteration follows the dense
+        ids. It also takes the list calls the experiment drivers make on
+        their activated node lists (extend).
+    """
+
+    def __init__(self, nodes, node_index, members=()):
+        """
+            Set Constructor
+
+            :param nodes: list of nodes, in dense id order
+            :param node_index: dictionary mapping each node to its dense id
+            :param members: initial nodes
+        """
+        self.nodes = nodes
+        self.node_index = node_index
+        self.mask = np.zeros(len(nodes), dtype=np.bool_)
+        self.size = 0
+        self.extend(members)
+
+    def __contains__(self, node):
+        i = self.node_index.get(node)
+        return i is not None and bool(self.mask[i])
+
+    def __iter__(self):
+        nodes = self.nodes
+        return iter([nodes[i] for i in np.flatnonzero(self.mask).tolist()])
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def add(self, node):
+        i = self.node_index[node]
+        if not self.mask[i]:
+            self.mask[i] = True
+            self.size += 1
+
+    def discard(self, node):
+        i = self.node_index.get(node)
+        if i is not None and self.mask[i]:
+            self.mask[i] = False
+            self.size -= 1
+
+    def extend(self, nodes):
+        """
+        :param nodes: iterable of nodes to add
+        """
+        for node in nodes:
+            self.add(node)
+
+    def ids(self):
+        """
+        :return: array with the dense ids of the members
+        """
+        return np.flatnonzero(self.mask)
+
+    def add_many(self, ids):
+        """
+        :param ids: array of dense node ids to add
+        """
+        ids = np.unique(ids)
+        self.size += int(len(ids) - self.mask[ids].sum())
+        self.mask[ids] = True
+
+    def discard_many(self, ids):
+        """
+        :param ids: array of dense node ids to remove
+        """
+        ids = np.unique(ids)
+        self.size -= int(self.mask[ids].sum())
+        self.mask[ids] = False
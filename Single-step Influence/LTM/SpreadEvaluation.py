@@ -0,0 +1,120 @@
+import numpy as np
+from statistics import NormalDist
+
+__license__ = "BSD-2-Clause"
+
+
+class SpreadCurve(object):
+    """
+        Running statistics of the active set size of every prefix of a
+        ranking (target set sizes 0 to k)
+
+        Batches of realizations are merged as they come, keeping the number
+        of runs, the mean and the sum of squared deviations of every prefix
+        (Chan et al. pairwise update), so that no realization is stored.
+    """
+
+    def __init__(self, points):
+        """
+            Curve Constructor
+
+            :param points: number of prefixes (target set sizes 0 to points-1)
+        """
+        self.runs = 0
+        self.mean = np.zeros(points, dtype=np.float64)
+        self.squares = np.zeros(points, dtype=np.float64)
+
+    def add(self, sizes):
+        """
+        Merge a batch of realizations
+
+        :param sizes: (runs x points) array of active set sizes, as returned by DiffusionModel.simulate_prefixes
+        """
+        runs = len(sizes)
+        if runs == 0:
+            return
+        mean = sizes.mean(axis=0)
+        squares = ((sizes - mean) ** 2).sum(axis=0)
+        total = self.runs + runs
+        delta = mean - self.mean
+        self.squares += squares + delta ** 2 * self.runs * runs / total
+        self.mean += delta * runs / total
+        self.runs = total
+
+    def variance(self):
+        """
+        :return: array with the sample variance of every prefix, inf until there are 2 runs
+        """
+        if self.runs < 2:
+            return np.full_like(self.mean, np.inf)
+        return self.squares / (self.runs - 1)
+
+    def half_width(self, confidence=0.95):
+        """
+        :param confidence: confidence level
+        :return: array with the half-width of the normal confidence interval of every prefix mean,
+                 inf until there are 2 runs
+        """
+        if self.runs < 2:
+            return np.full_like(self.mean, np.inf)
+        z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+        return z * np.sqrt(self.variance() / self.runs)
+
+    def interval(self, confidence=0.95):
+        """
+        :param confidence: confidence level
+        :return: (lower, upper) arrays bounding the mean of every prefix
+        """
+        h = self.half_width(confidence)
+        return self.mean - h, self.mean + h
+
+
+def evaluate_ranking(model, ranking, points, tolerance=None, confidence=0.95, batch=100, max_runs=1000,
+                     kernel=None, rng=None):
+    """
+    Spread-vs-target set size curve of a ranking, with early stopping
+
+    Runs batches of prefix simulations (see DiffusionModel.simulate_prefixes)
+    until every prefix mean is known within the tolerance at the given
+    confidence, or max_runs realizations have been run. It never stops
+    early before 2 realizations, when no variance is known yet.
+
+    :param model: a configured DiffusionModel, realizations start from its current status
+    :param ranking: ordered list of nodes
+    :param points: number of target set sizes, prefixes ranking[0:i] for i in range(points)
+    :param tolerance: target confidence interval half-width, in nodes (None: always run max_runs)
+    :param confidence: confidence level of the intervals
+    :param batch: number of realizations between two checks
+    :param max_runs: maximum number of realizations
+    :param kernel: batch kernel to use (default: the one returned by model.batch_kernel())
+    :param rng: numpy Generator to draw from (default: the model one)
+    :return: a SpreadCurve object
+    """
+    if kernel is None:
+        kernel = model.batch_kernel()
+    seeds = list(ranking[0:max(points - 1, 0)])
+    curve = SpreadCurve(len(seeds) + 1)
+    while curve.runs < max_runs:
+        curve.add(model.simulate_prefixes(seeds, min(batch, max_runs - curve.runs), kernel, rng))
+        if tolerance is not None and curve.runs >= 2 and curve.half_width(confidence).max() <= tolerance:
+            break
+    return curve
+
+
+def ActiveSetSizes(model, sorted_graph, tss_range, num_i=1000, tolerance=0.5, kernel=None):
+    """
+    Averaged active set size for each target set size ranging from 0 to tss_range,
+    as computed by the notebooks' experiment loops
+
+    :param model: a configured DiffusionModel
+    :param sorted_graph: ranked list of nodes
+    :param tss_range: number of target set sizes
+    :param num_i: maximum number of repetitions
+    :param tolerance: 95% confidence interval half-width to stop at
+    :param kernel: batch kernel to use (default: the one returned by model.batch_kernel()), pass
+                   ThresholdModel.batch_kernel(resample_thresholds=True) to redraw the thresholds
+                   at every repetition as the Linear Threshold notebook does
+    :return: list of averaged active set sizes
+    """
+    curve = evaluate_ranking(model, sorted_graph, tss_range, tolerance, max_runs=num_i, kernel=kernel)
+    return curve.mean.tolist()
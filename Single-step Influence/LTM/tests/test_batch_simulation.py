@@ -0,0 +1,21 @@
+import networkx as nx
+import numpy as np
+import ThresholdModel as tm
+from test_threshold_model import run
+
+
+def test_batches_match_iteration_bunch():
+    g = nx.connected_watts_strogatz_graph(80, 4, 0.2, seed=1)
+    model, config = tm.InitModel(g, seed=2)
+    run(model, config, [0])
+    model.checkpoint()
+    for seeds in ([1], [5, 6, 7], list(range(0, 80, 8))):
+        spread = model.simulate_batch(seeds, runs=4)
+        prefixes = model.simulate_prefixes(seeds, runs=4)
+        active_set_size, _ = run(model, config, seeds)
+        model.restore()
+        assert np.all(spread == active_set_size)
+        assert np.all(prefixes[:, -1] == active_set_size)
+        assert np.all(prefixes[:, 0] == model.status.count(1))
+        for i in range(1, len(seeds)):
+            assert np.all(prefixes[:, i] == model.simulate_batch(seeds[:i], runs=1)[0])
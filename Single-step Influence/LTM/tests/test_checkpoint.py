@@ -0,0 +1,37 @@
+import networkx as nx
+import numpy as np
+import ThresholdModel as tm
+from test_threshold_model import run
+
+
+def state(model):
+    return (dict(model.status), dict(model.initial_status), list(model.frontier), model.stop,
+            model.actual_iteration, dict(model.params['status']), model.accumulated.tolist(), model.pushed.tolist())
+
+
+def test_restore_undoes_runs():
+    g = nx.connected_watts_strogatz_graph(80, 4, 0.2, seed=1)
+    model, config = tm.InitModel(g, seed=2)
+    run(model, config, [0])
+    before = state(model)
+    model.checkpoint()
+    for seeds in ([3], [5, 6, 7], list(range(0, 80, 8))):
+        run(model, config, seeds)
+        model.restore()
+        assert state(model) == before
+    model.release()
+    assert model.journal is None
+
+
+def test_runs_from_a_checkpoint_match_fresh_models():
+    g = nx.connected_watts_strogatz_graph(80, 4, 0.2, seed=1)
+    model, config = tm.InitModel(g, seed=2)
+    run(model, config, [0])
+    model.checkpoint()
+    for seeds in ([3], [5, 6, 7], list(range(0, 80, 8))):
+        fresh, fresh_config = tm.InitModel(g, seed=2)
+        run(fresh, fresh_config, [0])
+        expected = run(fresh, fresh_config, seeds)
+        assert run(model, config, seeds) == expected
+        assert np.allclose(model.accumulated, fresh.accumulated)
+        model.restore()
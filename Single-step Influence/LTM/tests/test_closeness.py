@@ -0,0 +1,42 @@
+import networkx as nx
+import numpy as np
+import pytest
+from netdispatch import AGraph
+from CSRGraph import CSRGraph
+from Closeness import average_distances, CentralitySort
+
+
+def reference(g):
+    """
+    Average shortest distances as the notebooks' CentralitySort computes them
+    """
+    paths = dict(nx.all_pairs_shortest_path(g))
+    return {u: sum(len(p) - 1 for p in paths[u].values()) / len(g) for u in g.nodes}
+
+
+def test_exact_distances_match_shortest_paths():
+    for g in (nx.erdos_renyi_graph(60, 0.05, seed=1), nx.erdos_renyi_graph(60, 0.05, seed=1, directed=True)):
+        csr = CSRGraph(AGraph(g))
+        distances, error = average_distances(csr)
+        expected = reference(g)
+        assert np.allclose(distances, [expected[u] for u in csr.nodes])
+        assert error == 0.0
+    g = nx.erdos_renyi_graph(60, 0.05, seed=1)
+    expected = reference(g)
+    assert CentralitySort(g) == sorted(g.nodes, key=lambda u: expected[u])
+    assert CentralitySort(g, processes=2) == CentralitySort(g)
+
+
+def test_pivot_estimates_are_within_the_bound():
+    g = nx.connected_watts_strogatz_graph(300, 4, 0.1, seed=2)
+    csr = CSRGraph(AGraph(g))
+    exact, _ = average_distances(csr)
+    estimate, error = average_distances(csr, pivots=100, rng=np.random.default_rng(3))
+    assert 0 < error
+    assert np.all(np.abs(estimate - exact) <= error)
+
+
+def test_pivot_sampling_rejects_directed_graphs():
+    csr = CSRGraph(AGraph(nx.erdos_renyi_graph(30, 0.1, seed=4, directed=True)))
+    with pytest.raises(ValueError):
+        average_distances(csr, pivots=10)
@@ -0,0 +1,45 @@
+import networkx as nx
+import numpy as np
+from netdispatch import AGraph
+from CSRGraph import CSRGraph, expand_rows, transpose
+
+
+def snapshot(g):
+    return CSRGraph(AGraph(g))
+
+
+def test_rows_match_neighbour_lists():
+    for g in (nx.erdos_renyi_graph(40, 0.1, seed=1), nx.erdos_renyi_graph(40, 0.1, seed=1, directed=True)):
+        csr = snapshot(g)
+        for i, u in enumerate(csr.nodes):
+            expected = set(g.successors(u)) if g.is_directed() else set(g.neighbors(u))
+            assert set(csr.nodes[j] for j in csr.neighbors(i).tolist()) == expected
+        assert csr.number_of_slots() == (1 if g.is_directed() else 2) * g.number_of_edges()
+
+
+def test_transpose_lists_predecessors():
+    g = nx.erdos_renyi_graph(40, 0.1, seed=2, directed=True)
+    csr = snapshot(g)
+    t_indptr, t_sources, t_slots = csr.transpose()
+    for i, u in enumerate(csr.nodes):
+        rows = t_sources[t_indptr[i]:t_indptr[i + 1]]
+        assert set(csr.nodes[j] for j in rows.tolist()) == set(g.predecessors(u))
+        assert np.all(csr.indices[t_slots[t_indptr[i]:t_indptr[i + 1]]] == i)
+    assert np.array_equal(np.diff(t_indptr), csr.in_degree())
+
+
+def test_expand_rows_and_edge_values():
+    g = nx.erdos_renyi_graph(30, 0.2, seed=3)
+    csr = snapshot(g)
+    rows = np.array([4, 0, 4], dtype=np.int64)
+    slots, owners = expand_rows(csr.indptr, rows)
+    assert np.array_equal(csr.indices[slots], np.concatenate([csr.neighbors(i) for i in rows.tolist()]))
+    assert np.array_equal(rows[owners], csr.sources()[slots])
+
+    weights = {e: float(k) for k, e in enumerate(g.edges)}
+    values = csr.edge_values(weights)
+    for s, (i, j) in enumerate(zip(csr.sources().tolist(), csr.indices.tolist())):
+        u, v = csr.nodes[i], csr.nodes[j]
+        assert values[s] == weights.get((u, v), weights.get((v, u)))
+    assert np.array_equal(csr.edge_values(np.arange(g.number_of_edges(), dtype=np.float64)), values)
+    assert all(np.array_equal(a, b) for a, b in zip(transpose(csr.indptr, csr.indices), csr.transpose()))
@@ -0,0 +1,104 @@
+import networkx as nx
+import numpy as np
+import pytest
+import ThresholdModel as tm
+from DiffusionModel import ConfigurationException
+from ModelConfig import Configuration
+from test_threshold_model import run
+
+
+def graph():
+    return nx.connected_watts_strogatz_graph(80, 4, 0.2, seed=1)
+
+
+def runs(config, g, seeds=([0], [5, 6], [10, 20, 30])):
+    model = tm.ThresholdModel(g, 7)
+    return [run(model, config, list(s)) for s in seeds]
+
+
+def arrays(g):
+    model, config = tm.InitModel(g, seed=2)
+    return config.get_nodes_configuration()['threshold'], config.get_edges_configuration()['weight']
+
+
+def test_arrays_match_dictionaries():
+    g = graph()
+    thresholds, weights = arrays(g)
+    _, by_array = tm.InitModel(g, seed=2)
+    by_dict = Configuration()
+    by_dict.add_node_set_configuration('threshold', dict(zip(g.nodes, thresholds.tolist())))
+    by_dict.add_edge_set_configuration('weight', dict(zip(g.edges, weights.tolist())))
+    assert runs(by_array, g) == runs(by_dict, g)
+
+
+def test_misaligned_arrays_are_rejected():
+    g = graph()
+    thresholds, weights = arrays(g)
+    for threshold, weight in ((thresholds[:-1], weights), (np.append(thresholds, 0.5), weights),
+                              (thresholds, weights[:-1]), (thresholds, np.append(weights, 0.5))):
+        config = Configuration()
+        config.add_node_array('threshold', threshold)
+        config.add_edge_array('weight', weight)
+        config.add_model_initial_configuration("Infected", [0])
+        with pytest.raises(ConfigurationException):
+            tm.ThresholdModel(g, 7).set_initial_status(config)
+
+
+def test_mixed_array_and_item_updates():
+    g = graph()
+    thresholds, weights = arrays(g)
+    thresholds = thresholds.copy()
+    _, config = tm.InitModel(g, seed=2)
+    with pytest.raises(ConfigurationException):
+        config.add_node_configuration('threshold', 5, 0.0)
+    with pytest.raises(ConfigurationException):
+        config.add_edge_configuration('weight', list(g.edges)[0], 1.0)
+
+    # a whole dictionary replaces the array, and items can be updated again
+    config.add_node_set_configuration('threshold', dict(zip(g.nodes, thresholds.tolist())))
+    config.add_node_configuration('threshold', 5, 0.0)
+    thresholds[list(g.nodes).index(5)] = 0.0
+    reference = Configuration()
+    reference.add_node_array('threshold', thresholds)
+    reference.add_edge_array('weight', weights)
+    assert runs(config, g) == runs(reference, g)
+
+    # and an array replaces a dictionary
+    config.add_node_array('threshold', np.zeros(len(g)))
+    reference.add_node_set_configuration('threshold', {u: 0.0 for u in g.nodes})
+    assert runs(config, g) == runs(reference, g)
+
+
+def test_configuration_is_only_reloaded_when_modified():
+    g = graph()
+    edges = list(g.edges)
+    model, config = tm.InitModel(g, seed=2)
+    config.add_edge_set_configuration('delay', {e: 1.0 for e in edges})
+    config.add_node_set_configuration('reward', {u: 1.0 for u in g.nodes})
+
+    def arrays():
+        return (model.node_array('threshold'), model.edge_array('weight'), model.edge_array('delay'),
+                model.node_array('reward'))
+
+    run(model, config, [0])
+    before = arrays()
+    run(model, config, [1])
+    assert all(a is b for a, b in zip(arrays(), before))
+
+    config.add_edge_configuration('delay', edges[0], 3.0)
+    run(model, config, [2])
+    current = arrays()
+    assert current[2] is not before[2] and current[2].max() == 3.0
+    assert all(current[i] is before[i] for i in (0, 1, 3))
+    before = current
+
+    config.add_node_array('threshold', np.zeros(len(g)))
+    run(model, config, [2])
+    current = arrays()
+    assert current[0] is not before[0] and not current[0].any()
+    assert all(current[i] is before[i] for i in (1, 2, 3))
+
+    other = Configuration()
+    other.config = config.config
+    run(model, other, [0])
+    assert not any(a is b for a, b in zip(arrays(), current))
@@ -0,0 +1,121 @@
+import os
+import networkx as nx
+import numpy as np
+import ThresholdModel as tm
+from ReverseSampling import RRSets, RRSampler, RRSetCache, fingerprint
+
+
+def store(sets, n):
+    rr = RRSets(n)
+    rr.extend(np.concatenate([np.array(s, dtype=np.int64) for s in sets]),
+              np.concatenate([[0], np.cumsum([len(s) for s in sets])]))
+    return rr
+
+
+def test_max_coverage_is_greedy_coverage():
+    rng = np.random.default_rng(1)
+    sets = [sorted(set(rng.choice(40, size=rng.integers(1, 6)).tolist())) for _ in range(200)]
+    seeds, covered = store(sets, 40).max_coverage(5)
+    hit = set()
+    for u, c in zip(seeds, covered):
+        gains = [sum(1 for i, s in enumerate(sets) if i not in hit and v in s) for v in range(40)]
+        assert gains[u] == max(gains)
+        hit |= {i for i, s in enumerate(sets) if u in s}
+        assert c == len(hit)
+
+
+def test_max_coverage_never_repeats_a_seed():
+    seeds, covered = store([[0, 1], [1], [2]], 6).max_coverage(6)
+    assert sorted(seeds) == list(range(6))
+    assert covered[-1] == 3
+
+
+def test_rr_estimate_matches_simulations():
+    g = nx.erdos_renyi_graph(60, 0.1, seed=4)
+    model, config = tm.InitModel(g, seed=1)
+    config.add_model_initial_configuration("Infected", [])
+    model.set_initial_status(config)
+    sampler = RRSampler(model)
+    sets = RRSets(60)
+    sets.extend(*sampler.sample(20000))
+    # RR sets of the Linear Threshold model follow its random-threshold semantics
+    simulated = model.simulate_batch([0, 1], runs=4000, kernel=model.batch_kernel(resample_thresholds=True))
+    estimate = sets.estimate(np.array([0, 1]))
+    assert abs(estimate - simulated.mean()) <= 4 * (np.std(simulated) / np.sqrt(4000) + 60 / np.sqrt(20000))
+
+
+def configured(g, weight=None):
+    model, config = tm.InitModel(g, seed=1)
+    if weight is not None:
+        config.add_edge_array('weight', np.full(g.number_of_edges(), weight))
+    config.add_model_initial_configuration("Infected", [])
+    model.set_initial_status(config)
+    return model
+
+
+def variants(g):
+    return [configured(g), configured(g, 0.5), configured(g, 0.2)]
+
+
+def test_cache_hits_and_misses(tmp_path):
+    g = nx.erdos_renyi_graph(40, 0.1, seed=4)
+    model = configured(g)
+    cache = RRSetCache(str(tmp_path))
+    assert len(cache.get(model)) == 0
+    sets = RRSets(40)
+    sets.extend(*RRSampler(model).sample(500))
+    cache.put(model, sets)
+    cached = cache.get(configured(g))
+    assert len(cached) == 500
+    assert np.array_equal(cached.nodes, sets.nodes) and np.array_equal(cached.offsets, sets.offsets)
+    assert len(cache.get(configured(nx.erdos_renyi_graph(40, 0.1, seed=5)))) == 0
+
+
+def test_fingerprints_differ_across_models_and_parameters():
+    g = nx.erdos_renyi_graph(40, 0.1, seed=4)
+    assert fingerprint(configured(g)) == fingerprint(configured(g))
+    assert fingerprint(configured(g)) != fingerprint(configured(nx.relabel_nodes(g, lambda u: u + 1)))
+    assert fingerprint(configured(g)) != fingerprint(configured(nx.erdos_renyi_graph(40, 0.1, seed=5)))
+    assert len({fingerprint(m) for m in variants(g)}) == len(variants(g))
+
+
+def test_appending_to_a_store(tmp_path):
+    g = nx.erdos_renyi_graph(40, 0.1, seed=4)
+    model = configured(g)
+    cache = RRSetCache(str(tmp_path))
+    sampler = RRSampler(model)
+    sets = RRSets(40)
+    sets.extend(*sampler.sample(300))
+    cache.put(model, sets)
+    first = RRSets.latest(cache.path(model))
+
+    sets = cache.get(model)
+    sets.extend(*sampler.sample(200))
+    cache.put(model, sets)
+    assert len(cache.get(model)) == 500
+    assert np.array_equal(cache.get(model).offsets[:301], sets.offsets[:301])
+    # readers that picked the previous version can still map it
+    assert len(np.load(os.path.join(first, 'offsets.npy'), mmap_mode='r')) == 301
+
+    smaller = RRSets(40)
+    smaller.extend(*sampler.sample(100))
+    cache.put(model, smaller)
+    assert len(cache.get(model)) == 500
+
+    sets.extend(*sampler.sample(100))
+    cache.put(model, sets)
+    assert len(cache.get(model)) == 600
+    assert sorted(os.listdir(cache.path(model))) == ['sets-%012d' % 500, 'sets-%012d' % 600]
+
+
+def test_load_retries_a_removed_version(tmp_path, monkeypatch):
+    g = nx.erdos_renyi_graph(40, 0.1, seed=4)
+    model = configured(g)
+    cache = RRSetCache(str(tmp_path))
+    sets = RRSets(40)
+    sets.extend(*RRSampler(model).sample(300))
+    cache.put(model, sets)
+    latest = RRSets.latest
+    answers = [os.path.join(cache.path(model), 'sets-%012d' % 200)]
+    monkeypatch.setattr(RRSets, 'latest', staticmethod(lambda path: answers.pop() if answers else latest(path)))
+    assert len(cache.get(model)) == 300
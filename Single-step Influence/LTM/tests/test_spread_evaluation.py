@@ -0,0 +1,46 @@
+import networkx as nx
+import numpy as np
+import ThresholdModel as tm
+from SpreadEvaluation import SpreadCurve, evaluate_ranking
+from test_threshold_model import run
+
+
+def test_batches_merge_into_the_one_shot_statistics():
+    sizes = np.random.default_rng(0).poisson(20, size=(257, 6)).astype(np.float64)
+    curve = SpreadCurve(6)
+    start = 0
+    for runs in (1, 0, 2, 50, 3, 100, 101):
+        curve.add(sizes[start:start + runs])
+        start += runs
+    assert curve.runs == 257
+    assert np.allclose(curve.mean, sizes.mean(axis=0))
+    assert np.allclose(curve.variance(), sizes.var(axis=0, ddof=1))
+    assert np.allclose(curve.half_width(0.95), 1.959964 * sizes.std(axis=0, ddof=1) / np.sqrt(257))
+    lower, upper = curve.interval(0.99)
+    assert np.allclose(upper - lower, 2 * 2.575829 * sizes.std(axis=0, ddof=1) / np.sqrt(257))
+
+
+def test_no_interval_below_two_runs():
+    curve = SpreadCurve(3)
+    assert np.all(np.isinf(curve.half_width()))
+    curve.add(np.array([[1.0, 2.0, 3.0]]))
+    assert np.all(np.isinf(curve.variance()))
+    assert np.all(np.isinf(curve.half_width()))
+    curve.add(np.array([[1.0, 2.0, 3.0]]))
+    assert np.all(curve.half_width() == 0)
+
+
+def test_early_stop():
+    g = nx.connected_watts_strogatz_graph(80, 4, 0.2, seed=1)
+    model, config = tm.InitModel(g, seed=2)
+    run(model, config, [])
+    # fixed thresholds: every realization is the same
+    curve = evaluate_ranking(model, list(range(10)), 5, tolerance=0.5, batch=1, max_runs=50)
+    assert curve.runs == 2
+    assert np.all(curve.half_width() == 0)
+
+    kernel = model.batch_kernel(resample_thresholds=True)
+    curve = evaluate_ranking(model, list(range(10)), 5, tolerance=0.5, batch=25, max_runs=2000, kernel=kernel)
+    assert curve.runs % 25 == 0 and curve.runs < 2000
+    assert curve.half_width().max() <= 0.5
+    assert evaluate_ranking(model, list(range(10)), 5, batch=25, max_runs=100, kernel=kernel).runs == 100
@@ -0,0 +1,77 @@
+import networkx as nx
+import numpy as np
+import ThresholdModel as tm
+
+
+def reference_spread(g, thresholds, seeds):
+    """
+    Linear Threshold diffusion computed by full scans, as the original iteration does,
+    with the weights of the notebooks' InitModel
+    """
+    edges = list(g.edges)
+    weights = {(v, w): 1.0 / len(list(g.neighbors(w))) for (v, w) in edges}
+    active = set(seeds)
+    while True:
+        activated = [u for u in g.nodes if u not in active and
+                     sum(weights[(u, v)] for v in g.neighbors(u) if v in active and (u, v) in weights) >= thresholds[u]]
+        if not activated:
+            return active
+        active.update(activated)
+
+
+def run(model, config, seeds):
+    config.add_model_initial_configuration("Infected", seeds)
+    model.set_initial_status(config)
+    active_set_size, activated = model.iteration_bunch()
+    model.is_reset()
+    return active_set_size, activated
+
+
+def test_iteration_bunch_matches_full_scans():
+    g = nx.connected_watts_strogatz_graph(80, 4, 0.2, seed=1)
+    for seeds in ([1], [5, 6, 7], list(range(0, 80, 8))):
+        model, config = tm.InitModel(g, seed=2)
+        active_set_size, activated = run(model, config, seeds)
+        thresholds = dict(zip(model.csr.nodes, model.node_array('threshold')))
+        expected = reference_spread(g, thresholds, seeds)
+        assert active_set_size == len(expected)
+        assert set(activated) == expected - set(seeds)
+
+
+def test_frontier_only_holds_the_last_iteration():
+    g = nx.erdos_renyi_graph(100, 0.1, seed=1)
+    model, config = tm.InitModel(g, seed=1)
+    for u in range(30):
+        run(model, config, [u])
+    assert model.frontier == []
+    model.checkpoint()
+    active_set_size, _ = run(model, config, [31])
+    model.restore()
+    assert run(model, config, [31])[0] == active_set_size
+
+
+def notebook_weights(g):
+    """
+    Edge weights computed by the loop of the notebooks' InitModel, in graph.edges order
+    """
+    edge_dict = {}
+    for (v, w) in list(g.edges()):
+        counter = list(g.edges()).count((v, w))
+        if (w, v) in list(g.edges()):
+            counter += list(g.edges()).count((w, v))
+        edge_dict[(v, w)] = counter / len(list(g.neighbors(w)))
+    return [edge_dict[e] for e in g.edges()]
+
+
+def test_weights_match_the_notebook_loop():
+    rng = np.random.default_rng(3)
+    pairs = [tuple(p) for p in rng.integers(0, 25, size=(120, 2)).tolist()] + [(4, 4), (7, 7), (7, 7)]
+    for kind in (nx.Graph, nx.DiGraph, nx.MultiGraph, nx.MultiDiGraph):
+        g = kind()
+        g.add_nodes_from(range(25))
+        g.add_edges_from(pairs)
+        g.remove_nodes_from([u for u in list(g.nodes) if g.degree(u) == 0])
+        expected = notebook_weights(g)
+        model, config = tm.InitModel(g, seed=1)
+        assert np.allclose(tm.normalized_weights(model.csr), expected)
+        assert np.allclose(config.get_edges_configuration()['weight'], expected)